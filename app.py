@@ -282,17 +282,19 @@ def run_nrc_pipeline(seq, viewer_type, folding_mode, ref_pdb_id=None):
         # Pure NRC Math Engine
         all_atom_data = {}
         logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] INITIATING PHI-LATTICE FOLDING ENGINE...")
-        for frame in engine.fold_sequence(seq):
+        stages = [
+            (1, "STAGE 1: CA-SKELETON GLOBAL RESONANCE OPTIMIZATION"),
+            (16, "STAGE 2: COARSE PACKING & BACKBONE COVARIANCE"),
+            (26, "STAGE 3: ULTIMATE ALL-ATOM RESONANT FINALIZATION"),
+        ]
+        # Only every 5th frame is rendered as a log line; skip building the rest
+        for frame in engine.fold_sequence(seq, frame_stride=5):
             coords = frame["coords"]
             confidence = frame["confidence"]
             step = frame["step"]
             
-            if step == 1:
-                logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] STAGE 1: CA-SKELETON GLOBAL RESONANCE OPTIMIZATION")
-            elif step == 16:
-                logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] STAGE 2: COARSE PACKING & BACKBONE COVARIANCE")
-            elif step == 26:
-                logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] STAGE 3: ULTIMATE ALL-ATOM RESONANT FINALIZATION")
+            while stages and step >= stages[0][0]:
+                logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] {stages.pop(0)[1]}")
 
             if frame.get("all_atom"):
                 all_atom_data = {
@@ -358,6 +360,18 @@ def run_nrc_pipeline(seq, viewer_type, folding_mode, ref_pdb_id=None):
             mode='lines', line=dict(color='#00FF88', width=2)
         )])
         m_fig.update_layout(template="plotly_dark", margin=dict(l=0,r=0,b=0,t=0), title="φ-Spiral Projection")
+
+        # Windowed biophysical profiles (Sub-sampled)
+        res_x = indices + 1
+        h_fig = go.Figure(data=[
+            go.Scattergl(x=res_x, y=profile[indices], mode='lines', name=f"KD window {w}")
+            for w, profile in analysis["hydropathy_profile"].items()
+        ])
+        h_fig.update_layout(template="plotly_dark", title="Hydropathy Profile", xaxis_title="Residue Index", yaxis_title="Kyte-Doolittle")
+        ch_fig = go.Figure(data=go.Scattergl(
+            x=res_x, y=analysis["charge_profile"][indices], mode='lines', line=dict(color='#e74c3c'), fill='tozeroy'
+        ))
+        ch_fig.update_layout(template="plotly_dark", title="Charge Profile", xaxis_title="Residue Index", yaxis_title="Net Charge / Residue")
         
         # Summary
         summary_data = [
@@ -378,7 +392,7 @@ def run_nrc_pipeline(seq, viewer_type, folding_mode, ref_pdb_id=None):
         
         logs.append(f"[OK] FOLDING COMPLETE. MANIFOLD STABILIZED.")
         yield [
-            "\n".join(logs), l_fig, m_fig, None, None, None, None, 
+            "\n".join(logs), l_fig, m_fig, None, h_fig, ch_fig, None, 
             summary_df, zip_path, pdb_preview, "".join(analysis["dssp"]), 
             analysis["pI"], meta["hash"], coords, analysis, final_meta
         ]
@@ -1,24 +1,43 @@
+import functools
+import threading
+from collections import OrderedDict
+
 import numpy as np
 from typing import Dict, List, Tuple
 import requests
 from scipy.spatial import ConvexHull
 from scipy.linalg import svd
 
+from nrc_sequence import NRCSequence
+from nrc_structure import NRCStructure
+
 class BiophysicsSuite:
     """Research-grade biophysical analysis engine."""
     # Bjellqvist pKa values
     PKA = {'K': 10.0, 'R': 12.0, 'H': 5.98, 'D': 4.05, 'E': 4.45, 'C': 9.0, 'Y': 10.0, 'N-term': 7.5, 'C-term': 3.55}
-    HYDROPATHY = {'A': 1.8, 'R': -4.5, 'N': -3.5, 'D': -3.5, 'C': 2.5, 'Q': -3.5, 'E': -3.5, 'G': -0.4, 'H': -3.2, 'I': 4.5, 'L': 3.8, 'K': -3.9, 'M': 1.9, 'F': 2.8, 'P': -1.6, 'S': -0.8, 'T': -0.7, 'W': -0.9, 'Y': -1.3, 'V': 4.2}
-    CHARGES = {'R': 1, 'K': 1, 'H': 0.1, 'D': -1, 'E': -1}
+    HYDROPATHY = NRCSequence.HYDROPATHY
+    CHARGES = NRCSequence.CHARGES
+    # Column order of composition vectors / matrices
+    RESIDUE_ORDER = NRCSequence.RESIDUE_ORDER
+    # Titratable groups: termini first, then side chains; basic groups carry +1, acidic -1
+    IONIZABLE = ('N-term', 'K', 'R', 'H', 'C-term', 'D', 'E', 'C', 'Y')
+    PH_GRID = np.linspace(0.0, 14.0, 1401)
+    PI_CACHE_SIZE = 65536
+    _pi_cache: OrderedDict = OrderedDict()
+    _pi_cache_lock = threading.Lock()
 
     @staticmethod
-    def analyze_sequence(seq: str, coords: np.ndarray, confidence: np.ndarray) -> Dict:
-        """Full biophysical characterization suite."""
+    def analyze_sequence(seq: str, coords: np.ndarray, confidence: np.ndarray, hydropathy_windows: Tuple[int, ...] = (9, 19), charge_window: int = 9) -> Dict:
+        """ Full biophysical characterization suite.
+        hydropathy_profile maps each Kyte-Doolittle window to its smoothed profile; charge_profile is the windowed net charge per residue. """
         phi, psi = BiophysicsSuite.calculate_phi_psi(coords)
+        codes = NRCSequence.encode(seq)
         res = {
             "pI": BiophysicsSuite.estimate_pi(seq),
-            "hydropathy": [BiophysicsSuite.HYDROPATHY.get(aa, 0) for aa in seq],
-            "charge": [BiophysicsSuite.CHARGES.get(aa, 0) for aa in seq],
+            "hydropathy": NRCSequence.lookup(codes, "hydropathy").tolist(),
+            "charge": NRCSequence.lookup(codes, "charge").tolist(),
+            "hydropathy_profile": {w: NRCSequence.profile(seq, "hydropathy", w) for w in hydropathy_windows},
+            "charge_profile": NRCSequence.profile(seq, "charge", charge_window),
             "dssp": BiophysicsSuite.assign_secondary_structure(coords),
             "pockets": BiophysicsSuite.map_binding_pockets(coords),
             "ramachandran": {"phi": phi, "psi": psi},
@@ -46,73 +65,116 @@ class BiophysicsSuite:
         return np.array(manifold_coords)
 
     @staticmethod
-    def calculate_phi_psi(coords: np.ndarray) -> Tuple[List[float], List[float]]:
+    def calculate_phi_psi(coords: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """ Calculate Phi/Psi angles (pseudo-angles for C-alpha only lattice). Padded to match len(coords) exactly for Plotly alignment. """
-        n = len(coords)
-        phi_angles = [0.0] * n
-        psi_angles = [0.0] * n
+        phi, psi = BiophysicsSuite.calculate_phi_psi_batch(np.asarray(coords)[None])
+        return phi[0], psi[0]
+
+    @staticmethod
+    def calculate_phi_psi_batch(frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Pseudo Phi/Psi angles for a (B, N, 3) stack of C-alpha frames as two float32 (B, N) arrays.
+        Each window of 4 consecutive C-alphas gives the virtual dihedral anchored at its second atom;
+        the ends and windows with a degenerate central bond stay 0. """
+        frames = np.asarray(frames, dtype=np.float64)
+        b, n = frames.shape[:2]
+        phi = np.zeros((b, n), dtype=np.float32)
+        psi = np.zeros((b, n), dtype=np.float32)
         if n < 4:
-            return phi_angles, psi_angles
-        for i in range(1, n - 2):
-            # Virtual dihedral between 4 consecutive C-alphas
-            p0, p1, p2, p3 = coords[i-1], coords[i], coords[i+1], coords[i+2]
-            b1 = p1 - p0
-            b2 = p2 - p1
-            b3 = p3 - p2
-            n1 = np.cross(b1, b2)
-            n2 = np.cross(b2, b3)
-            # Safe norm to avoid zero division
-            norm_b2 = np.linalg.norm(b2)
-            if norm_b2 < 1e-6:
-                continue
-            m1 = np.cross(n1, b2 / norm_b2)
-            x = np.dot(n1, n2)
-            y = np.dot(m1, n2)
-            angle = np.degrees(np.arctan2(y, x))
-            # Map back to residues (using i as anchor)
-            psi_angles[i] = float(angle)
-            phi_angles[i] = float(angle * 0.8)  # Heuristic projection
-        return phi_angles, psi_angles
+            return phi, psi
+        bonds = np.diff(frames, axis=1)
+        b1, b2, b3 = bonds[:, :-2], bonds[:, 1:-1], bonds[:, 2:]
+        n1 = np.cross(b1, b2)
+        n2 = np.cross(b2, b3)
+        # Safe norm to avoid zero division
+        norm_b2 = np.linalg.norm(b2, axis=-1)
+        valid = norm_b2 >= 1e-6
+        unit_b2 = b2 / np.where(valid, norm_b2, 1.0)[..., None]
+        m1 = np.cross(n1, unit_b2)
+        x = np.einsum("bij,bij->bi", n1, n2)
+        y = np.einsum("bij,bij->bi", m1, n2)
+        angle = np.where(valid, np.degrees(np.arctan2(y, x)), 0.0)
+        # Map back to residues (using the second atom of each window as anchor)
+        psi[:, 1:n - 2] = angle
+        phi[:, 1:n - 2] = angle * 0.8  # Heuristic projection
+        return phi, psi
+
+    @staticmethod
+    def composition(seq: str) -> np.ndarray:
+        """Residue counts of seq in RESIDUE_ORDER columns; letters outside the 20 standard residues are ignored."""
+        return NRCSequence.composition(seq)
 
     @staticmethod
     def estimate_pi(seq: str) -> float:
         """Estimate isoelectric point using Bjellqvist pKa values."""
-        def charge_at_ph(ph):
-            q = 1.0 / (1.0 + 10**(ph - BiophysicsSuite.PKA['N-term']))
-            q -= 1.0 / (1.0 + 10**(BiophysicsSuite.PKA['C-term'] - ph))
-            for aa in seq:
-                if aa in ['K', 'R', 'H']:
-                    q += 1.0 / (1.0 + 10**(ph - BiophysicsSuite.PKA[aa]))
-                elif aa in ['D', 'E', 'C', 'Y']:
-                    q -= 1.0 / (1.0 + 10**(BiophysicsSuite.PKA[aa] - ph))
-            return q
-        low, high = 0.0, 14.0
-        for _ in range(15):
-            mid = (low + high) / 2
-            if charge_at_ph(mid) > 0:
-                low = mid
-            else:
-                high = mid
-        return round(mid, 2)
+        return float(BiophysicsSuite.estimate_pi_batch(BiophysicsSuite.composition(seq)[None])[0])
 
     @staticmethod
-    def assign_secondary_structure(coords: np.ndarray) -> List[str]:
-        """ Refined DSSP assignment using C-alpha geometric constraints. Identifies Helices (H) and Sheets (E) via distance-angle heuristics. """
-        n = len(coords)
-        if n < 4:
-            return ["C"] * n
-        dssp = ["C"] * n
-        # Calculate distances for i, i+3 (Helix) and i, i+4
-        for i in range(1, n - 3):
-            d13 = np.linalg.norm(coords[i+3] - coords[i])
-            d12 = np.linalg.norm(coords[i+2] - coords[i])
-            # Alpha Helix: compact spiral, d13 ~5.0-6.0A
-            if 4.8 < d13 < 6.2:
-                dssp[i:i+3] = ["H"] * 3
-            # Beta Sheet: extended conformation, d12 > 6.5A
-            elif d12 > 6.5:
-                dssp[i:i+2] = ["E"] * 2
-        return dssp
+    def estimate_pi_batch(compositions: np.ndarray) -> np.ndarray:
+        """ Isoelectric points for a (B, 20) composition matrix in RESIDUE_ORDER columns.
+        The net charge of every uncached composition is evaluated on PH_GRID as one matmul of its ionizable-group
+        counts with the Henderson-Hasselbalch basis, and the zero crossing is interpolated linearly between grid points. """
+        compositions = np.asarray(compositions)
+        # pI only depends on the titratable counts, so compositions sharing them share a cache entry
+        sidechains = [k for k, group in enumerate(BiophysicsSuite.IONIZABLE) if group in BiophysicsSuite.RESIDUE_ORDER]
+        groups = np.ones((len(compositions), len(BiophysicsSuite.IONIZABLE)), dtype=np.int64)  # one of each terminus
+        groups[:, sidechains] = compositions[:, [BiophysicsSuite.RESIDUE_ORDER.index(BiophysicsSuite.IONIZABLE[k]) for k in sidechains]]
+        if len(groups) == 1:
+            unique, inverse = groups, np.zeros(1, dtype=np.intp)
+        else:
+            unique, inverse = np.unique(groups, axis=0, return_inverse=True)
+        keys = [row.tobytes() for row in unique]
+        cache = BiophysicsSuite._pi_cache
+        values = np.empty(len(unique))
+        missing = []
+        # The LRU is shared by every thread; titration itself runs outside the lock
+        with BiophysicsSuite._pi_cache_lock:
+            for row, key in enumerate(keys):
+                pi = cache.get(key)
+                if pi is None:
+                    missing.append(row)
+                else:
+                    values[row] = pi
+                    cache.move_to_end(key)
+        if missing:
+            values[missing] = [round(float(pi), 2) for pi in BiophysicsSuite._titrate(unique[missing])]
+            with BiophysicsSuite._pi_cache_lock:
+                cache.update((keys[row], float(values[row])) for row in missing)
+                while len(cache) > BiophysicsSuite.PI_CACHE_SIZE:
+                    cache.popitem(last=False)
+        return values[inverse.ravel()]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def titration_basis() -> np.ndarray:
+        """(len(IONIZABLE), len(PH_GRID)) signed charge fraction of one copy of each titratable group across PH_GRID."""
+        grid = BiophysicsSuite.PH_GRID
+        pka = np.array([BiophysicsSuite.PKA[group] for group in BiophysicsSuite.IONIZABLE])[:, None]
+        basic = np.array([group in ('N-term', 'K', 'R', 'H') for group in BiophysicsSuite.IONIZABLE])[:, None]
+        basis = np.where(basic, 1.0 / (1.0 + 10 ** (grid - pka)), -1.0 / (1.0 + 10 ** (pka - grid)))
+        basis.flags.writeable = False
+        return basis
+
+    @staticmethod
+    def _titrate(groups: np.ndarray, chunk: int = 4096) -> np.ndarray:
+        """Zero crossings of the net charge curves for (U, len(IONIZABLE)) titratable-group counts."""
+        grid, basis = BiophysicsSuite.PH_GRID, BiophysicsSuite.titration_basis()
+        pis = np.empty(len(groups))
+        for lo in range(0, len(groups), chunk):
+            charge = groups[lo:lo + chunk] @ basis
+            # Net charge falls monotonically with pH, so the positive prefix length locates the crossing
+            above = np.count_nonzero(charge > 0, axis=1)
+            left = np.clip(above - 1, 0, len(grid) - 2)
+            rows = np.arange(len(charge))
+            q0, q1 = charge[rows, left], charge[rows, left + 1]
+            pi = grid[left] + q0 / (q0 - q1) * (grid[1] - grid[0])
+            pis[lo:lo + chunk] = np.where(above == 0, grid[0], np.where(above == len(grid), grid[-1], pi))
+        return pis
+
+    @staticmethod
+    def assign_secondary_structure(coords: np.ndarray, min_run: int = 1) -> List[str]:
+        """ Refined DSSP assignment using C-alpha geometric constraints. Identifies Helices (H) and Sheets (E) via distance-angle heuristics.
+        Alpha Helix: compact spiral, d(i, i+3) ~4.8-6.2A; Beta Sheet: extended conformation, d(i, i+2) > 6.5A. """
+        return NRCStructure.assign(coords, "window", min_run).tolist()
 
     @staticmethod
     def map_binding_pockets(coords: np.ndarray) -> List[Dict]:
@@ -230,10 +292,5 @@ class BiophysicsSuite:
     @staticmethod
     def resonance_error(seq: str) -> float:
         """Measure deviation from Digital Root 7 stability using TTT-7 anchor."""
-        if not seq: return 0.0
-        # Calculate digital root for each residue's ASCII sum
-        def digital_root(n): return (n - 1) % 9 + 1
-        roots = [digital_root(sum(map(ord, aa))) for aa in seq]
-        # Deviation from the stable anchor 7
-        error = sum(abs(dr - 7) for dr in roots) / len(seq)
-        return float(error)
+        # Mean |digital root - 7| of each residue's ASCII code
+        return float(NRCSequence.resonance_error_batch([seq])[0])
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+
+from nrc_forcefield import NRCForcefield
+
+
+def loop_scatter(grad: np.ndarray, idx_i: np.ndarray, idx_j: np.ndarray, pair_grad: np.ndarray) -> None:
+    """Reference per-pair Python loop (the previous energy_and_gradient implementation)."""
+    for k, (i, j) in enumerate(zip(idx_i, idx_j)):
+        grad[i] += pair_grad[k]
+        grad[j] -= pair_grad[k]
+
+
+def add_at_scatter(grad: np.ndarray, idx_i: np.ndarray, idx_j: np.ndarray, pair_grad: np.ndarray) -> None:
+    """Unbuffered np.add.at scatter over the pair index arrays."""
+    np.add.at(grad, idx_i, pair_grad)
+    np.add.at(grad, idx_j, -pair_grad)
+
+
+def benchmark_gradient_scatter(sizes: tuple = (100, 1000, 5000, 10000), repeats: int = 3) -> None:
+    """Times the pairwise gradient scatter of NRCForcefield on compact globules.
+
+    Compares the former Python loop, np.add.at and the per-axis np.bincount
+    scatter now used by energy_and_gradient, and checks they agree.
+    Run from the repository root: PYTHONPATH=. python examples/benchmark_gradient_scatter.py
+    """
+    rng = np.random.default_rng(7)
+    print(f"{'residues':>9} {'pairs':>9} {'loop (s)':>10} {'add.at (s)':>11} {'bincount (s)':>13} {'speedup':>8}")
+    for n in sizes:
+        ff = NRCForcefield("A" * n)
+        # Uniform ball at protein packing density (~110 A^3 per residue)
+        radius = (3.0 * 110.0 * n / (4.0 * np.pi)) ** (1.0 / 3.0)
+        direction = rng.normal(size=(n, 3))
+        direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+        coords = direction * radius * rng.random((n, 1)) ** (1.0 / 3.0)
+        idx_i, idx_j = ff._get_spatial_neighbors(coords, cutoff=ff.cutoff)
+        pair_grad = coords[idx_i] - coords[idx_j]
+
+        timings = {}
+        results = {}
+        for name, scatter in (("loop", loop_scatter), ("add.at", add_at_scatter), ("bincount", NRCForcefield._scatter_pair_gradient)):
+            best = np.inf
+            for _ in range(1 if name == "loop" else repeats):
+                grad = np.zeros_like(coords)
+                start = time.perf_counter()
+                scatter(grad, idx_i, idx_j, pair_grad)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+            results[name] = grad
+
+        assert np.allclose(results["loop"], results["bincount"]) and np.allclose(results["loop"], results["add.at"])
+        speedup = timings["loop"] / timings["bincount"]
+        print(f"{n:>9} {len(idx_i):>9} {timings['loop']:>10.4f} {timings['add.at']:>11.4f} {timings['bincount']:>13.5f} {speedup:>7.0f}x")
+
+
+if __name__ == "__main__":
+    benchmark_gradient_scatter()
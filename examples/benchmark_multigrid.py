@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+
+from nrc_forcefield import NRCForcefield
+
+
+def _timed_fold(sequence: str, fold) -> tuple:
+    """Runs fold(ff) and records (seconds, energy) for every full-resolution energy evaluation."""
+    ff = NRCForcefield(sequence)
+    energy_and_gradient = ff.energy_and_gradient
+    trace = []
+    start = time.perf_counter()
+
+    def traced(x):
+        result = energy_and_gradient(x)
+        trace.append((time.perf_counter() - start, result[0]))
+        return result
+
+    ff.energy_and_gradient = traced
+    fold(ff)
+    return time.perf_counter() - start, trace
+
+
+def benchmark_multigrid(sizes: tuple = (2000, 10000), levels: int = 3, factor: int = 8, max_iter: int = 500) -> None:
+    """Times flat L-BFGS-B against coarse-to-fine multigrid folding of NRCForcefield.
+
+    Reports each mode's total wall time and final energy, and the time multigrid needs to
+    reach the flat descent's final energy.
+    Run from the repository root: PYTHONPATH=. python examples/benchmark_multigrid.py
+    """
+    print(f"{'residues':>9} {'flat (s)':>9} {'flat E':>11} {'multigrid (s)':>14} {'multigrid E':>12} {'to flat E (s)':>14}")
+    for n in sizes:
+        sequence = ("ACDEFGHIKLMNPQRSTVWY" * (n // 20 + 1))[:n]
+        flat_time, flat_trace = _timed_fold(sequence, lambda ff: ff.optimize(max_iter=max_iter))
+        target = flat_trace[-1][1]
+        mg_time, mg_trace = _timed_fold(sequence, lambda ff: ff.optimize_multigrid(levels=levels, factor=factor, max_iter=max_iter))
+        reached = next((t for t, e in mg_trace if e <= target), np.nan)
+        print(f"{n:>9} {flat_time:>9.2f} {target:>11.4g} {mg_time:>14.2f} {mg_trace[-1][1]:>12.4g} {reached:>14.2f}")
+
+
+if __name__ == "__main__":
+    benchmark_multigrid()
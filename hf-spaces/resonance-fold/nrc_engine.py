@@ -14,6 +14,8 @@ class NRCEngine:
     LATTICE_DIM = 2048 # TTT-7 Stable (2+0+4+8=14 -> 5)
     FOLD_DIM = 512    # TTT-7 Stable (5+1+2=8)
     MAX_SEQUENCE_LENGTH = 77777 
+    RELAX_MAX_ITER = 500
+    RELAX_FRAME_EVERY = 50
 
     
     def __init__(self, precision: type = np.float32):
@@ -61,22 +63,15 @@ class NRCEngine:
         }
 
         # Step 2: Thermodynamic Relaxation Loop (Pure Math)
-        # We'll run a few iterations and yield frames for the "wow" effect
+        # A single warm L-BFGS-B descent streams a frame every RELAX_FRAME_EVERY iterations,
+        # keeping its curvature history across frames instead of restarting per frame.
         max_steps = 100
-        for step in range(1, max_steps + 1):
-            # In a real real-time app, we'd do partial optimization steps.
-            # Here we simulate the progress for visualization.
-            # We'll run a mini-optimization every 10 steps or just interpolate.
+        for iteration, coords, final in ff.optimize_session(max_iter=self.RELAX_MAX_ITER, frame_every=self.RELAX_FRAME_EVERY):
+            # Map optimizer progress onto the 0-100 visualization step scale
+            step = max_steps if final else min(max_steps - 1, iteration * max_steps // self.RELAX_MAX_ITER)
             
-            # For the final step, we do the full optimization
-            if step == max_steps:
-                coords = ff.optimize(max_iter=500)
-            else:
-                # Interpolate or do a shallow optimize
-                # To keep it fast for Gradio, we'll just do a shallow optimize
-                coords = ff.optimize(max_iter=5)
-            
-            # Rescale to Angstroms (3.8A C-alpha resonance)
+            # Rescale to Angstroms (3.8A C-alpha resonance) for display only;
+            # the optimizer state itself is never rescaled
             p_diffs = np.linalg.norm(np.diff(coords, axis=0), axis=1)
             avg_len = np.mean(p_diffs) if len(p_diffs) > 0 else 1.0
             if avg_len > 0:
@@ -86,14 +81,13 @@ class NRCEngine:
             confidence = np.full(n, 70.0 + (step / max_steps) * 25.0)
             stability = 7.0 + (step / max_steps) * 2.0
             
-            if step % 10 == 0 or step == max_steps:
-                yield {
-                    "step": step,
-                    "coords": coords,
-                    "confidence": confidence,
-                    "stability": stability,
-                    "final": (step == max_steps)
-                }
+            yield {
+                "step": step,
+                "coords": coords,
+                "confidence": confidence,
+                "stability": stability,
+                "final": final
+            }
 
     def _generate_projection_matrix(self) -> np.ndarray:
         """Generates a diversified 2048D -> 3D projection manifold."""
@@ -1,3 +1,5 @@
+import queue
+import threading
 import numpy as np
 from scipy.optimize import minimize
 from scipy.spatial.distance import pdist
@@ -7,6 +9,7 @@ class NRCForcefield:
         self.N = N
         self.phi = (1 + np.sqrt(5)) / 2
         self.x0 = self.spherical_fibonacci_initialization(N)
+        self.last_result = None
 
     def spherical_fibonacci_initialization(self, N):
         """Generates a 3D spherical distribution of points to avoid 2D collapse."""
@@ -67,17 +70,78 @@ class NRCForcefield:
         
         return lj_energy + qrt_energy + ttt_energy
 
-    def optimize(self, max_iter=500):
-        """Relaxes the 3D structure using L-BFGS-B."""
+    def optimize(self, max_iter=500, callback=None, frame_every=1):
+        """Relaxes the 3D structure using L-BFGS-B.
+
+        If given, callback(iteration, coords) is invoked every frame_every iterations
+        from inside the single descent, so intermediate frames never restart the
+        optimizer or discard its curvature history. Raising StopIteration from the
+        callback ends the descent early.
+        """
+        iteration = 0
+
+        def on_iteration(xk):
+            nonlocal iteration
+            iteration += 1
+            if iteration % frame_every == 0:
+                callback(iteration, xk.reshape(-1, 3).copy())
+
         # No strict bounds needed for free-folding in space
         res = minimize(
             self.total_energy, 
             self.x0, 
             method='L-BFGS-B', 
+            callback=on_iteration if callback is not None else None,
             options={'maxiter': max_iter, 'disp': False}
         )
+        self.last_result = res
         return res.x.reshape(-1, 3)
 
+    def optimize_session(self, max_iter=500, frame_every=50):
+        """Resumable optimizer session streaming one L-BFGS-B descent.
+
+        Yields (iteration, coords, final) every frame_every iterations and once more with
+        the converged result. The descent runs in a worker thread that waits for the
+        consumer at each frame; closing the generator early cancels the descent.
+        """
+        frames = queue.Queue(maxsize=1)
+        cancelled = threading.Event()
+
+        def emit(item):
+            while not cancelled.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            raise StopIteration
+
+        def run():
+            try:
+                coords = self.optimize(max_iter=max_iter, callback=lambda it, xk: emit((it, xk, False)), frame_every=frame_every)
+                emit((self.last_result.nit, coords, True))
+            except StopIteration:
+                pass
+            except Exception as exc:  # Surface optimizer failures to the consumer
+                try:
+                    emit(exc)
+                except StopIteration:
+                    pass
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = frames.get()
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+                if item[2]:
+                    return
+        finally:
+            cancelled.set()
+            worker.join()
+
 if __name__ == "__main__":
     # Quick verification test
     n_residues = 20
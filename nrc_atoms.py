@@ -1,3 +1,5 @@
+import functools
+
 import numpy as np
 
 class NRCAtoms:
@@ -45,6 +47,77 @@ class NRCAtoms:
         'R': {'CB': [0.0, 1.54, 0.0], 'CG': [0.0, 3.0, 0.0], 'CD': [0.0, 4.5, 0.0], 'NE': [0.0, 6.0, 0.0], 'CZ': [0.0, 7.5, 0.0], 'NH1': [1.2, 8.3, 0.0], 'NH2': [-1.2, 8.3, 0.0]},
     }
 
+    # Residue order of the compiled template store (one-letter codes)
+    RESIDUE_ORDER = "ACDEFGHIKLMNPQRSTVWY"
+    # One record per template atom; the store is a single contiguous array of these
+    TEMPLATE_DTYPE = np.dtype([('residue', 'U1'), ('name', 'U4'), ('element', 'U2'), ('xyz', '<f8', (3,))])
+
+    @classmethod
+    def _compile_templates(cls):
+        """
+        Compiles BACKBONE and SIDECHAINS into the contiguous, read-only template store.
+        Residue r (in RESIDUE_ORDER) owns records TEMPLATE_OFFSETS[r]:TEMPLATE_OFFSETS[r + 1],
+        in get_full_residue atom order (CA, backbone, side chain).
+        """
+        records = []
+        for aa in cls.RESIDUE_ORDER:
+            atoms = {'CA': [0.0, 0.0, 0.0], **cls.BACKBONE, **cls.SIDECHAINS[aa]}
+            records.extend((aa, name, name[0], rel) for name, rel in atoms.items())
+        store = np.array(records, dtype=cls.TEMPLATE_DTYPE)
+        counts = np.array([sum(1 for r in records if r[0] == aa) for aa in cls.RESIDUE_ORDER])
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        for array in (store, counts, offsets):
+            array.flags.writeable = False
+        cls.TEMPLATES = store
+        cls.TEMPLATE_COUNTS = counts
+        cls.TEMPLATE_OFFSETS = offsets
+
+    @classmethod
+    def template_buffer(cls):
+        """Read-only view of the packed template store, e.g. for copying into shared memory."""
+        return memoryview(cls.TEMPLATES).cast('B').toreadonly()
+
+    @classmethod
+    def templates_from_buffer(cls, buffer):
+        """Zero-copy, read-only TEMPLATE_DTYPE view over a buffer filled from template_buffer()."""
+        store = np.frombuffer(buffer, dtype=cls.TEMPLATE_DTYPE)
+        store.flags.writeable = False
+        return store
+
+    @classmethod
+    def residue_template(cls, aa):
+        """Template records of one residue; unknown residues get the backbone-only Gly template."""
+        row = cls.RESIDUE_ORDER.find(aa) if len(aa) == 1 else -1
+        row = row if row >= 0 else cls.RESIDUE_ORDER.index('G')
+        return cls.TEMPLATES[cls.TEMPLATE_OFFSETS[row]:cls.TEMPLATE_OFFSETS[row + 1]]
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def template_table(cls):
+        """
+        Padded residue templates for batched placement, scattered from the template store.
+        Returns read-only (coords (20, max_atoms, 3), names (20, max_atoms), counts (20,)); rows
+        follow RESIDUE_ORDER and padding slots are zero / empty.
+        """
+        counts = cls.TEMPLATE_COUNTS
+        rows = np.repeat(np.arange(len(counts)), counts)
+        slots = np.arange(len(cls.TEMPLATES)) - np.repeat(cls.TEMPLATE_OFFSETS[:-1], counts)
+        coords = np.zeros((len(counts), counts.max(), 3))
+        names = np.zeros((len(counts), counts.max()), dtype='U4')
+        coords[rows, slots] = cls.TEMPLATES['xyz']
+        names[rows, slots] = cls.TEMPLATES['name']
+        # Cached and shared by every caller
+        coords.flags.writeable = False
+        names.flags.writeable = False
+        return coords, names, counts
+
+    @classmethod
+    def encode(cls, sequence):
+        """Maps a one-letter sequence to template rows; unknown residues use the backbone-only Gly row."""
+        lookup = np.full(256, cls.RESIDUE_ORDER.index('G'), dtype=np.uint8)
+        lookup[np.frombuffer(cls.RESIDUE_ORDER.encode('ascii'), dtype=np.uint8)] = np.arange(len(cls.RESIDUE_ORDER))
+        return lookup[np.frombuffer(sequence.encode('ascii', 'replace'), dtype=np.uint8)]
+
     @classmethod
     def get_rotation_from_angles(cls, phi, psi):
         """
@@ -73,16 +146,12 @@ class NRCAtoms:
             # Generate torsion-covariant frame if not provided
             rotation_matrix = cls.get_rotation_from_angles(phi, psi)
             
-        res_atoms = {'CA': ca_coord}
-        
-        # Add Backbone
-        for atom, rel in cls.BACKBONE.items():
-            res_atoms[atom] = ca_coord + rotation_matrix @ rel
-            
-        # Add Sidechain
-        sc = cls.SIDECHAINS.get(aa, {})
-        for atom, rel in sc.items():
-            # Sidechains are projected using the same covariant frame
-            res_atoms[atom] = ca_coord + rotation_matrix @ np.array(rel)
-            
+        # Place the compiled CA / backbone / side-chain template with one matmul
+        template = cls.residue_template(aa)
+        placed = ca_coord + template['xyz'] @ np.asarray(rotation_matrix).T
+        res_atoms = dict(zip(template['name'].tolist(), placed))
+        res_atoms['CA'] = ca_coord
         return res_atoms
+
+
+NRCAtoms._compile_templates()
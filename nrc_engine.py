@@ -1,5 +1,7 @@
+import os
 import numpy as np
 import time
+from collections import OrderedDict
 from typing import List, Dict, Optional, Generator
 
 class NRCEngine:
@@ -12,84 +14,245 @@ class NRCEngine:
     PHI = (1 + np.sqrt(5)) / 2
     GOLDEN_ANGLE = 2 * np.pi / (PHI**2)
     LATTICE_DIM = 2048 # TTT-7 Stable
+    ACTIVE_DIMS = 3    # Columns the fold actually reads and writes (x, y, z)
+    FOLD_STEPS = 30
+    DELTA_ENCODINGS = ("float16", "int16")
+    TURBULENCE_DTYPE = np.dtype(np.float64)
+
+    # Approximate backbone geometry relative to CA, in emission order
+    BACKBONE_ATOMS = ("CA", "N", "C", "O")
+    BACKBONE_OFFSETS = np.array([
+        [0.0, 0.0, 0.0],
+        [-1.46, 0.0, 0.0],
+        [1.52, 0.0, 0.0],
+        [1.52, 1.23, 0.0],
+    ])
     
-    def __init__(self, precision: type = np.float32):
+    def __init__(self, precision: type = np.float32, turbulence_cache_bytes: int = 64 * 2**20, cache_dir: Optional[str] = None):
         self.precision = precision
         self.lattice_harmonics = self._generate_lattice_harmonics()
+        # LRU of (FOLD_STEPS, n, 3) QRT displacement tables keyed by sequence length, bounded by
+        # their total nbytes, optionally persisted as .npy files and memory-mapped back on a restarted worker
+        self.turbulence_cache_bytes = turbulence_cache_bytes
+        self.cache_dir = cache_dir or os.environ.get("NRC_QRT_CACHE_DIR")
+        self._turbulence_cache: OrderedDict = OrderedDict()
+        self._turbulence_cache_nbytes = 0
 
     def _generate_lattice_harmonics(self) -> np.ndarray:
         indices = np.arange(self.LATTICE_DIM, dtype=self.precision)
         return np.exp(1j * self.GOLDEN_ANGLE * indices)
 
-    def fold_sequence(self, sequence: str, mode: str = "NRC_GEOMETRIC", templates: Optional[Dict] = None) -> Generator[Dict, None, None]:
+    def fold_sequence(
+        self,
+        sequence: str,
+        mode: str = "NRC_GEOMETRIC",
+        templates: Optional[Dict] = None,
+        dense_lattice: bool = False,
+        frame_stride: int = 1,
+        delta_encoding: Optional[str] = None
+    ) -> Generator[Dict, None, None]:
+        """
+        Folds the sequence on the phi-lattice, yielding one all-atom frame per step.
+        By default only the 3 active lattice columns are materialized (O(n*3) memory);
+        pass dense_lattice=True to fold on the full (n, LATTICE_DIM) manifold.
+
+        Streaming options:
+        - frame_stride: yield only every k-th step (the final step is always yielded);
+          frame_stride=FOLD_STEPS yields the final frame alone.
+        - delta_encoding: "float16" or "int16". The first yielded frame and the final
+          frame carry full coords; frames in between carry a quantized per-residue (n, 3)
+          CA "delta" against the previous yielded frame, to be applied with
+          decode_delta_frame(). Delta frames carry "confidence" as one scalar rather than
+          a per-atom array.
+        """
+        if frame_stride < 1:
+            raise ValueError(f"frame_stride must be >= 1, got {frame_stride}.")
+        if delta_encoding not in (None, *self.DELTA_ENCODINGS):
+            raise ValueError(f"Unknown delta_encoding '{delta_encoding}'. Expected one of {self.DELTA_ENCODINGS}.")
+
         n = len(sequence)
         
         # 1. Initialize mathematical manifold using LPE
-        lattice = self._initialize_lattice(n)
-        
-        for step in range(1, 31):
+        lattice = self._initialize_lattice(n, dense=dense_lattice)
+
+        # Per-atom metadata depends only on the sequence; shared by every frame
+        atom_types, res_indices, res_names = self._build_frame_metadata(sequence)
+        reference = None
+
+        turbulence = self.turbulence_table(n)
+
+        for step in range(1, self.FOLD_STEPS + 1):
             # Apply QRT (Quantum Residue Turbulence) perturbations for geometric refinement
-            turbulence = np.sin(step * self.PHI) * np.cos(np.arange(n) * self.GOLDEN_ANGLE)
-            lattice[:, 0] += turbulence * 0.5
-            lattice[:, 1] += np.cos(turbulence * self.PHI) * 0.5
-            lattice[:, 2] += np.sin(turbulence * self.PHI**2) * 0.5
-            
-            # Simulated confidence based on TTT-7 lattice convergence
-            confidence = np.full(n, 70.0 + step * 0.99, dtype=np.float32)
-            
-            # Atom assignment logic for the 3D Viewer (CA backbone)
-            # To prevent crashing, we must output full all-atom formats expected by the UI.
-            # We will provide CA, C, N, O for basic backbone representation.
-            all_coords = []
-            atom_types = []
-            res_indices = []
-            res_names = []
+            lattice[:, :3] += turbulence[step - 1]
+
+            final = step == self.FOLD_STEPS
+            if step % frame_stride and not final:
+                continue
             
-            for i in range(n):
-                base = lattice[i, :3]
-                # CA
-                all_coords.append(base)
-                atom_types.append("CA")
-                res_indices.append(i + 1)
-                res_names.append(sequence[i])
-                
-                # N (approximate geometry)
-                all_coords.append(base + np.array([-1.46, 0, 0]))
-                atom_types.append("N")
-                res_indices.append(i + 1)
-                res_names.append(sequence[i])
-                
-                # C (approximate geometry)
-                all_coords.append(base + np.array([1.52, 0, 0]))
-                atom_types.append("C")
-                res_indices.append(i + 1)
-                res_names.append(sequence[i])
-                
-                # O (approximate geometry)
-                all_coords.append(base + np.array([1.52, 1.23, 0]))
-                atom_types.append("O")
-                res_indices.append(i + 1)
-                res_names.append(sequence[i])
-
-            full_coords = np.array(all_coords, dtype=np.float32)
-            full_confidence = np.repeat(confidence, 4)
-
-            yield {
+            # Simulated confidence based on TTT-7 lattice convergence (uniform across atoms)
+            confidence = np.float32(70.0 + step * 0.99)
+
+            frame = {
                 "step": step,
-                "coords": full_coords,
-                "confidence": full_confidence,
-                "final": step == 30,
+                "final": final,
+                "all_atom": True
+            }
+            if delta_encoding is None or reference is None or final:
+                # Atom assignment logic for the 3D Viewer (CA backbone)
+                # To prevent crashing, we must output full all-atom formats expected by the UI.
+                # We will provide CA, N, C, O for basic backbone representation.
+                full_coords = self._build_backbone_frame(lattice)
+                frame.update({
+                    "coords": full_coords,
+                    "confidence": np.full(len(full_coords), confidence, dtype=np.float32),
+                    "atom_types": atom_types,
+                    "res_indices": res_indices,
+                    "res_names": res_names
+                })
+                reference = full_coords
+            else:
+                # N, C and O sit at fixed offsets from CA, so only the per-residue CA move is sent
+                ca = reference[::len(self.BACKBONE_ATOMS)]
+                delta, scale = self._encode_delta(lattice[:, :3] - ca, delta_encoding)
+                frame.update({"delta": delta, "delta_scale": scale, "confidence": float(confidence)})
+                # Track the decoder-side reconstruction so quantization error does not accumulate
+                reference = self.decode_delta_frame(reference, frame)
+            if delta_encoding is not None:
+                frame["encoding"] = "full" if "coords" in frame else delta_encoding
+            yield frame
+
+    def fold_batch(self, sequences: List[str]) -> List[Dict]:
+        """
+        Folds many sequences in one pass and returns the final frame of each.
+        The LPE seed and QRT turbulence depend only on residue index, so the whole batch
+        is folded on a single lattice of the longest length; every sequence reads its
+        prefix of it, sharing the trig tables and all per-step updates.
+        """
+        if not sequences:
+            return []
+        max_n = max(len(seq) for seq in sequences)
+        lattice = self._initialize_lattice(max_n)
+        turbulence = self.turbulence_table(max_n)
+        for step in range(1, self.FOLD_STEPS + 1):
+            lattice += turbulence[step - 1]
+
+        confidence = np.float32(70.0 + self.FOLD_STEPS * 0.99)
+        n_atoms = len(self.BACKBONE_ATOMS)
+        results = []
+        for seq in sequences:
+            atom_types, res_indices, res_names = self._build_frame_metadata(seq)
+            results.append({
+                "step": self.FOLD_STEPS,
+                "coords": self._build_backbone_frame(lattice[:len(seq)]),
+                "confidence": np.full(len(seq) * n_atoms, confidence, dtype=np.float32),
+                "final": True,
                 "all_atom": True,
                 "atom_types": atom_types,
                 "res_indices": res_indices,
                 "res_names": res_names
-            }
+            })
+        return results
+
+    def turbulence_table(self, n: int) -> np.ndarray:
+        """
+        Returns the (FOLD_STEPS, n, 3) QRT displacement tensor for an n-residue fold.
+        Tables depend only on n, so repeated folds of the same length skip all trig evaluation.
+        The least recently used tables are evicted once the cache holds more than
+        turbulence_cache_bytes; the most recent table is always kept.
+        """
+        table = self._turbulence_cache.get(n)
+        if table is not None:
+            self._turbulence_cache.move_to_end(n)
+            return table
+
+        shape = (self.FOLD_STEPS, n, 3)
+        path = None
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"qrt_turbulence_{n}_{self.FOLD_STEPS}steps_{self.TURBULENCE_DTYPE.name}.npy")
+        if path and os.path.exists(path):
+            # A truncated or mismatched file is recomputed and overwritten
+            try:
+                table = np.load(path, mmap_mode="r")
+            except (ValueError, OSError):
+                table = None
+            if table is not None and (table.shape != shape or table.dtype != self.TURBULENCE_DTYPE):
+                table = None
+        if table is None:
+            table = self._compute_turbulence_table(n)
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, table)
+                os.replace(tmp_path, path)
+
+        self._turbulence_cache[n] = table
+        self._turbulence_cache_nbytes += table.nbytes
+        while self._turbulence_cache_nbytes > self.turbulence_cache_bytes and len(self._turbulence_cache) > 1:
+            self._turbulence_cache_nbytes -= self._turbulence_cache.popitem(last=False)[1].nbytes
+        return table
+
+    def _compute_turbulence_table(self, n: int) -> np.ndarray:
+        """Evaluates the QRT turbulence for every step at once."""
+        steps = np.arange(1, self.FOLD_STEPS + 1).reshape(-1, 1)
+        turbulence = np.sin(steps * self.PHI) * np.cos(np.arange(n) * self.GOLDEN_ANGLE)
+        table = np.empty((self.FOLD_STEPS, n, 3), dtype=self.TURBULENCE_DTYPE)
+        table[:, :, 0] = turbulence * 0.5
+        table[:, :, 1] = np.cos(turbulence * self.PHI) * 0.5
+        table[:, :, 2] = np.sin(turbulence * self.PHI**2) * 0.5
+        return table
+
+    @staticmethod
+    def _encode_delta(delta: np.ndarray, encoding: str):
+        """Quantizes a coordinate delta into a float16 or scaled int16 buffer."""
+        if encoding == "float16":
+            return delta.astype(np.float16), 1.0
+        peak = float(np.max(np.abs(delta))) if delta.size else 0.0
+        scale = peak / np.iinfo(np.int16).max if peak > 0 else 1.0
+        return np.round(delta / scale).astype(np.int16), scale
+
+    @classmethod
+    def decode_delta_frame(cls, previous_coords: np.ndarray, frame: Dict) -> np.ndarray:
+        """
+        Reconstructs full coords from the previous frame's coords and a (possibly delta) frame.
+        A delta frame moves every CA by its (n, 3) row and re-places N, C, O via BACKBONE_OFFSETS.
+        """
+        if "coords" in frame:
+            return frame["coords"]
+        delta = frame["delta"].astype(np.float32) * np.float32(frame["delta_scale"])
+        ca = previous_coords[::len(cls.BACKBONE_ATOMS)] + delta
+        return (ca[:, np.newaxis, :] + cls.BACKBONE_OFFSETS).reshape(-1, 3).astype(np.float32)
+
+    def _build_frame_metadata(self, sequence: str):
+        """Builds the per-atom (atom_types, res_indices, res_names) lists once per sequence."""
+        n_atoms = len(self.BACKBONE_ATOMS)
+        atom_types = list(self.BACKBONE_ATOMS) * len(sequence)
+        res_indices = np.repeat(np.arange(1, len(sequence) + 1), n_atoms).tolist()
+        res_names = [aa for aa in sequence for _ in range(n_atoms)]
+        return atom_types, res_indices, res_names
+
+    def _build_backbone_frame(self, lattice: np.ndarray) -> np.ndarray:
+        """Places CA, N, C, O for every residue with one broadcast add of the offset template."""
+        frame = lattice[:, np.newaxis, :3] + self.BACKBONE_OFFSETS
+        return frame.reshape(-1, 3).astype(np.float32)
+
+    def expand_lattice(self, lattice: np.ndarray) -> np.ndarray:
+        """Expands a compact (n, ACTIVE_DIMS) lattice into the full (n, LATTICE_DIM) manifold."""
+        if lattice.shape[1] == self.LATTICE_DIM:
+            return lattice
+        full = np.zeros((lattice.shape[0], self.LATTICE_DIM), dtype=lattice.dtype)
+        full[:, :lattice.shape[1]] = lattice
+        return full
 
-    def _initialize_lattice(self, n: int) -> np.ndarray:
-        """Initializes the n-residue sequence as a high-dimensional spiral resonance."""
+    def _initialize_lattice(self, n: int, dense: bool = False) -> np.ndarray:
+        """
+        Initializes the n-residue sequence as a high-dimensional spiral resonance.
+        Only the ACTIVE_DIMS projected columns are allocated unless dense=True.
+        """
         z = np.arange(n, dtype=self.precision).reshape(-1, 1)
         angles = z * self.GOLDEN_ANGLE
-        lattice = np.zeros((n, self.LATTICE_DIM), dtype=self.precision)
+        width = self.LATTICE_DIM if dense else self.ACTIVE_DIMS
+        lattice = np.zeros((n, width), dtype=self.precision)
         
         # Base LPE (Lattice-Parity Embeddings) projection into 3D
         # This acts as our "Perfect Match" starting backbone structure
@@ -0,0 +1,128 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+
+def _fused_nonbonded(coords, cutoff, k_res, modular_scale, codes, pair_sigma2, pair_epsilon, pair_qq, coulomb_cutoff, coulomb_on):
+    """
+    Fused Tesla 3-6-9 Exclusion + TTT-7 Anchor + sequence Lennard-Jones / switched Coulomb kernel.
+    pair_* are the flattened residue-type combination tables (epsilon pre-scaled by the steric
+    weight, charge products by the Coulomb prefactor); coulomb_cutoff <= 0 disables Coulomb.
+    Builds a cell list, walks each atom's 27 neighbor cells and accumulates energy and
+    gradient in one compiled pass. Every atom owns its gradient row (each pair is visited
+    from both ends and its energy halved), so the prange loop needs no atomics.
+    Returns (energy, grad) for (n, 3) float64 coords.
+    """
+    n = coords.shape[0]
+    grad = np.zeros((n, 3))
+    if n < 2:
+        return 0.0, grad
+    cutoff2 = cutoff * cutoff
+    n_types = np.int64(np.sqrt(len(pair_sigma2) - 1))
+    rc2 = coulomb_cutoff * coulomb_cutoff
+    ron2 = coulomb_on * coulomb_on
+    switch_denom = (rc2 - ron2) ** 3
+    two_pi_3 = 2 * np.pi / 3.0
+    ttt_factor = 2 * np.pi / 9.0
+
+    # Linear cell IDs on a grid padded by one cell so neighbor offsets never wrap
+    cells = np.empty((n, 3), dtype=np.int64)
+    for i in range(n):
+        for a in range(3):
+            cells[i, a] = np.int64(np.floor(coords[i, a] / cutoff))
+    lo = np.empty(3, dtype=np.int64)
+    dims = np.empty(3, dtype=np.int64)
+    for a in range(3):
+        lo[a] = cells[:, a].min() - 1
+        dims[a] = cells[:, a].max() - lo[a] + 2
+    cell_id = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        cell_id[i] = ((cells[i, 0] - lo[0]) * dims[1] + (cells[i, 1] - lo[1])) * dims[2] + (cells[i, 2] - lo[2])
+
+    # Sort atoms by cell; occupied cells become contiguous runs
+    order = np.argsort(cell_id)
+    sorted_ids = cell_id[order]
+    n_runs = 1
+    for p in range(1, n):
+        if sorted_ids[p] != sorted_ids[p - 1]:
+            n_runs += 1
+    occupied = np.empty(n_runs, dtype=np.int64)
+    starts = np.empty(n_runs + 1, dtype=np.int64)
+    occupied[0] = sorted_ids[0]
+    starts[0] = 0
+    r = 0
+    for p in range(1, n):
+        if sorted_ids[p] != sorted_ids[p - 1]:
+            r += 1
+            occupied[r] = sorted_ids[p]
+            starts[r] = p
+    starts[n_runs] = n
+
+    energy = 0.0
+    for i in prange(n):
+        xi, yi, zi = coords[i, 0], coords[i, 1], coords[i, 2]
+        gx = 0.0
+        gy = 0.0
+        gz = 0.0
+        e_i = 0.0
+        for dx in range(-1, 2):
+            for dy in range(-1, 2):
+                for dz in range(-1, 2):
+                    target = cell_id[i] + (dx * dims[1] + dy) * dims[2] + dz
+                    slot = np.searchsorted(occupied, target)
+                    if slot >= n_runs or occupied[slot] != target:
+                        continue
+                    for p in range(starts[slot], starts[slot + 1]):
+                        j = order[p]
+                        if j == i:
+                            continue
+                        ux = xi - coords[j, 0]
+                        uy = yi - coords[j, 1]
+                        uz = zi - coords[j, 2]
+                        d2 = ux * ux + uy * uy + uz * uz
+                        if d2 >= cutoff2:
+                            continue
+                        d = np.sqrt(d2) + 1e-9
+                        dr = d * modular_scale
+                        damping = 1.0 / (1.0 + 0.1 * d * d)
+                        periodic = 1.0 + np.cos(two_pi_3 * dr)
+                        ttt_phase = ttt_factor * (dr - 7.0)
+                        e_i += 0.5 * (k_res * damping * periodic - 50.0 * np.cos(ttt_phase))
+                        mag = (
+                            -k_res * damping * two_pi_3 * np.sin(two_pi_3 * dr) * modular_scale
+                            - k_res * periodic * (0.2 * d) * damping * damping
+                            + 50.0 * ttt_factor * np.sin(ttt_phase) * modular_scale
+                        ) / d
+                        if j != i - 1 and j != i + 1:
+                            pt = codes[i] * n_types + codes[j]
+                            sr2 = pair_sigma2[pt] / (d * d)
+                            sr6 = sr2 * sr2 * sr2
+                            e_i += 0.5 * 4.0 * pair_epsilon[pt] * (sr6 * sr6 - sr6)
+                            mag -= 24.0 * pair_epsilon[pt] * (2.0 * sr6 * sr6 - sr6) / (d * d)
+                            qq = pair_qq[pt]
+                            if qq != 0.0 and coulomb_cutoff > 0.0 and d < coulomb_cutoff:
+                                r2 = min(max(d * d, ron2), rc2)
+                                switch = (rc2 - r2) ** 2 * (rc2 + 2.0 * r2 - 3.0 * ron2) / switch_denom
+                                dswitch = 12.0 * d * (rc2 - r2) * (ron2 - r2) / switch_denom
+                                e_c = qq / d
+                                e_i += 0.5 * e_c * switch
+                                mag += e_c * (dswitch - switch / d) / d
+                        gx += mag * ux
+                        gy += mag * uy
+                        gz += mag * uz
+        grad[i, 0] = gx
+        grad[i, 1] = gy
+        grad[i, 2] = gz
+        energy += e_i
+    return energy, grad
+
+
+if NUMBA_AVAILABLE:
+    fused_nonbonded = njit(parallel=True, cache=True)(_fused_nonbonded)
+else:
+    fused_nonbonded = None
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class NRCStructure:
+    """
+    NRC C-alpha geometry: secondary-structure assignment from i -> i+2 / i -> i+3 C-alpha
+    distance arrays, evaluated as boolean masks over the whole chain at once.
+    """
+    LABELS = np.array(['C', 'H', 'E'])
+    COIL, HELIX, STRAND = 0, 1, 2
+
+    # "window" scheme: a compact i -> i+3 span opens a 3-residue helix, an extended
+    # i -> i+2 span a 2-residue strand; later windows overwrite earlier ones
+    HELIX_SPAN = (4.8, 6.2)
+    STRAND_SPAN = 6.5
+    # "local" scheme: the i-1 -> i+1 span alone labels residue i
+    LOCAL_HELIX = 5.5
+    LOCAL_STRAND = 6.5
+
+    @staticmethod
+    def ca_distances(coords, offset):
+        """(n - offset,) distances between C-alpha i and i + offset."""
+        coords = np.asarray(coords, dtype=np.float64)
+        return np.linalg.norm(coords[offset:] - coords[:-offset], axis=1)
+
+    @classmethod
+    def assign(cls, coords, scheme="window", min_run=1):
+        """
+        Per-residue 'C' / 'H' / 'E' labels as a (n,) array for scheme "window" or "local".
+        H / E runs shorter than min_run are smoothed back to coil.
+        """
+        n = len(coords)
+        codes = np.zeros(n, dtype=np.uint8)
+        if n >= 4:
+            if scheme == "window":
+                cls._window_codes(coords, codes)
+            elif scheme == "local":
+                span = cls.ca_distances(coords, 2)[:n - 3]
+                codes[1:n - 2] = np.where(span < cls.LOCAL_HELIX, cls.HELIX, np.where(span > cls.LOCAL_STRAND, cls.STRAND, cls.COIL))
+            else:
+                raise ValueError(f"unknown secondary-structure scheme {scheme!r}")
+        if min_run > 1:
+            codes = cls._smooth_runs(codes, min_run)
+        return cls.LABELS[codes]
+
+    @classmethod
+    def _window_codes(cls, coords, codes):
+        """Window-scheme labels in place; equivalent to visiting the anchors i = 1 .. n-4 in order."""
+        n = len(codes)
+        d13 = cls.ca_distances(coords, 3)[1:n - 3]
+        d12 = cls.ca_distances(coords, 2)[1:n - 3]
+        # Anchor a is stored at [a + 2]; only anchors 1 .. n-4 are active
+        helix = np.zeros(n + 2, dtype=bool)
+        strand = np.zeros(n + 2, dtype=bool)
+        helix[3:n - 1] = (cls.HELIX_SPAN[0] < d13) & (d13 < cls.HELIX_SPAN[1])
+        strand[3:n - 1] = ~helix[3:n - 1] & (d12 > cls.STRAND_SPAN)
+        # Residue p reads anchor p - k at [p + 2 - k]. The last anchor to cover p wins:
+        # p itself (H or E), then p - 1 (H or E), then p - 2 (H only)
+        h0, h1, h2 = helix[2:], helix[1:-1], helix[:-2]
+        s0, s1 = strand[2:], strand[1:-1]
+        codes[:] = np.select(
+            [h0, s0, h1, s1, h2],
+            [cls.HELIX, cls.STRAND, cls.HELIX, cls.STRAND, cls.HELIX],
+            cls.COIL,
+        )
+
+    @classmethod
+    def _smooth_runs(cls, codes, min_run):
+        """Relabels H / E runs shorter than min_run as coil via run-length encoding."""
+        if not len(codes):
+            return codes
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        lengths = np.diff(np.r_[starts, len(codes)])
+        values = codes[starts]
+        values[(lengths < min_run) & (values != cls.COIL)] = cls.COIL
+        return np.repeat(values, lengths)
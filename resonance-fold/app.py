@@ -18,6 +18,9 @@ import plotly.graph_objects as go
 import requests  # type: ignore[import-untyped]
 from plotly.subplots import make_subplots
 
+from nrc_sequence import NRCSequence
+from nrc_structure import NRCStructure
+
 # ─── NRC Constants ───────────────────────────────────────────────────────────
 PHI = (1.0 + math.sqrt(5.0)) / 2.0
 GIZA_SLOPE = 51.853
@@ -130,27 +133,19 @@ def validate_sequence(seq: str) -> tuple[bool, str]:
 
 
 def compute_properties(seq: str) -> dict:
+    props = NRCSequence.properties(seq)
     n = len(seq)
-    mw = sum(AA_INFO.get(aa, ("", 0, 0))[1] for aa in seq) - (n - 1) * 18.015
-    gravy = sum(AA_INFO.get(aa, ("", 0, 0))[2] for aa in seq) / max(n, 1)
-    counts: dict[str, int] = {}
-    for aa in seq:
-        counts[aa] = counts.get(aa, 0) + 1
-    composition = {aa: round(c / n * 100, 1) for aa, c in sorted(counts.items())}
-    polar = sum(1 for aa in seq if aa in "STNQCY")
-    nonpolar = sum(1 for aa in seq if aa in "AVLIPFMWG")
-    positive = sum(1 for aa in seq if aa in "RKH")
-    negative = sum(1 for aa in seq if aa in "DE")
+    composition = {aa: round(c / n * 100, 1) for aa, c in zip(NRCSequence.RESIDUE_ORDER, props["composition"].tolist()) if c}
     return {
         "length": n,
-        "mw": round(mw, 1),
-        "gravy": round(gravy, 4),
+        "mw": round(float(props["mw"]), 1),
+        "gravy": round(float(props["gravy"]), 4),
         "composition": composition,
-        "polar": polar,
-        "nonpolar": nonpolar,
-        "positive": positive,
-        "negative": negative,
-        "charge_ph7": round(positive * 0.8 - negative * 0.9, 1),
+        "polar": int(props["polar"]),
+        "nonpolar": int(props["nonpolar"]),
+        "positive": int(props["positive"]),
+        "negative": int(props["negative"]),
+        "charge_ph7": round(float(props["charge_ph7"]), 1),
     }
 
 
@@ -291,24 +286,8 @@ def assign_dssp_simple(pdb_text: str) -> list[str]:
                 coords.append((x, y, z))
             except (ValueError, IndexError):
                 pass
-    if len(coords) < 4:
-        return ["C"] * len(coords)
-
-    assignments = ["C"] * len(coords)
-    for i in range(1, len(coords) - 2):
-        # Use CA-CA distances to estimate secondary structure
-        math.sqrt(sum((a - b) ** 2 for a, b in zip(coords[i - 1], coords[i])))
-        math.sqrt(sum((a - b) ** 2 for a, b in zip(coords[i], coords[i + 1])))
-        d3 = math.sqrt(sum((a - b) ** 2 for a, b in zip(coords[i - 1], coords[i + 1])))
-
-        if d3 < 5.5:
-            assignments[i] = "H"  # helix
-        elif d3 > 6.5:
-            assignments[i] = "E"  # strand
-        else:
-            assignments[i] = "C"  # coil
-
-    return assignments
+    # Helix if the i-1 -> i+1 CA span is < 5.5 Å, strand if > 6.5 Å
+    return NRCStructure.assign(np.array(coords).reshape(-1, 3), "local").tolist()
 
 
 # ─── Visualization ────────────────────────────────────────────────────────────
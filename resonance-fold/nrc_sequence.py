@@ -0,0 +1,141 @@
+import numpy as np
+
+
+class NRCSequence:
+    """
+    NRC sequence featurization: encodes sequences to uint8 residue codes once and derives
+    compositions and per-residue properties from them with gathers and matmuls,
+    for a single sequence or a whole batch.
+    """
+    # Code / composition-column order; every other character is coded UNKNOWN and contributes 0
+    RESIDUE_ORDER = "ACDEFGHIKLMNPQRSTVWY"
+    UNKNOWN = len(RESIDUE_ORDER)
+
+    # Kyte-Doolittle hydropathy
+    HYDROPATHY = {'A': 1.8, 'R': -4.5, 'N': -3.5, 'D': -3.5, 'C': 2.5, 'Q': -3.5, 'E': -3.5, 'G': -0.4, 'H': -3.2, 'I': 4.5, 'L': 3.8, 'K': -3.9, 'M': 1.9, 'F': 2.8, 'P': -1.6, 'S': -0.8, 'T': -0.7, 'W': -0.9, 'Y': -1.3, 'V': 4.2}
+    # Side-chain charge at neutral pH (His ~10% protonated)
+    CHARGES = {'R': 1, 'K': 1, 'H': 0.1, 'D': -1, 'E': -1}
+    # Average mass of the free amino acid (Da); a peptide loses one water per peptide bond
+    MASS = {'A': 89.09, 'R': 174.20, 'N': 132.12, 'D': 133.10, 'C': 121.16, 'E': 147.13, 'Q': 146.15, 'G': 75.03, 'H': 155.16, 'I': 131.17, 'L': 131.17, 'K': 146.19, 'M': 149.21, 'F': 165.19, 'P': 115.13, 'S': 105.09, 'T': 119.12, 'W': 204.23, 'Y': 181.19, 'V': 117.15}
+    WATER_MASS = 18.015
+    # In-chain residue mass used for the Golden lattice projection
+    RESIDUE_MASS = {'A': 71.04, 'R': 156.19, 'N': 114.10, 'D': 115.09, 'C': 103.14, 'E': 129.12, 'Q': 128.13, 'G': 57.05, 'H': 137.14, 'I': 113.16, 'L': 113.16, 'K': 128.17, 'M': 131.19, 'F': 147.18, 'P': 97.12, 'S': 87.08, 'T': 101.11, 'W': 186.21, 'Y': 163.18, 'V': 99.13}
+    # Residue classes counted by properties()
+    CLASSES = {'polar': "STNQCY", 'nonpolar': "AVLIPFMWG", 'positive': "RKH", 'negative': "DE"}
+
+    @classmethod
+    def _compile_tables(cls):
+        """Builds the byte -> code table and the per-code property / class tables once at import."""
+        codes = np.full(256, cls.UNKNOWN, dtype=np.uint8)
+        codes[np.frombuffer(cls.RESIDUE_ORDER.encode('ascii'), dtype=np.uint8)] = np.arange(len(cls.RESIDUE_ORDER))
+        cls.CODE_TABLE = codes
+        # One row per code, the trailing UNKNOWN row is all zeros
+        cls.TABLES = {
+            name: np.array([values.get(aa, 0.0) for aa in cls.RESIDUE_ORDER] + [0.0])
+            for name, values in (('hydropathy', cls.HYDROPATHY), ('charge', cls.CHARGES), ('mass', cls.MASS), ('residue_mass', cls.RESIDUE_MASS))
+        }
+        cls.CLASS_MATRIX = np.array([[aa in members for members in cls.CLASSES.values()] for aa in cls.RESIDUE_ORDER], dtype=np.int64)
+        for table in (codes, cls.CLASS_MATRIX, *cls.TABLES.values()):
+            table.flags.writeable = False
+
+    @classmethod
+    def _flatten(cls, sequences):
+        """Concatenated code points of all sequences and their lengths."""
+        lengths = np.fromiter(map(len, sequences), dtype=np.intp, count=len(sequences))
+        return np.frombuffer(''.join(sequences).encode('utf-32-le'), dtype='<u4'), lengths
+
+    @classmethod
+    def _codes(cls, points):
+        return cls.CODE_TABLE[np.minimum(points, 255)]
+
+    @classmethod
+    def encode(cls, sequence):
+        """Translates a one-letter sequence into uint8 codes; characters outside RESIDUE_ORDER become UNKNOWN."""
+        return cls._codes(cls._flatten([sequence])[0])
+
+    @classmethod
+    def encode_batch(cls, sequences):
+        """Encodes a batch into a (B, max_len) uint8 code matrix padded with UNKNOWN, plus the (B,) lengths."""
+        points, lengths = cls._flatten(sequences)
+        codes = np.full((len(sequences), lengths.max(initial=0)), cls.UNKNOWN, dtype=np.uint8)
+        codes[np.arange(lengths.max(initial=0)) < lengths[:, None]] = cls._codes(points)
+        return codes, lengths
+
+    @classmethod
+    def lookup(cls, codes, name):
+        """Per-position values of property table name ('hydropathy', 'charge', 'mass', 'residue_mass') for any code array."""
+        return cls.TABLES[name][codes]
+
+    @classmethod
+    def profile(cls, sequence, name, window):
+        """profile_batch for a single sequence, as an (n,) array."""
+        return cls.profile_batch([sequence], name, window)[0, :len(sequence)]
+
+    @classmethod
+    def profile_batch(cls, sequences, name, window):
+        """
+        (B, max_len) sliding-window mean of property table name centred on every residue, from per-row
+        prefix sums in O(total length). Windows are truncated at the chain ends; padding past each length is 0.
+        """
+        codes, lengths = cls.encode_batch(sequences)
+        prefix = np.zeros((codes.shape[0], codes.shape[1] + 1))
+        np.cumsum(cls.TABLES[name][codes], axis=1, out=prefix[:, 1:])
+        positions = np.arange(codes.shape[1])
+        lo = np.maximum(positions - (window - 1) // 2, 0)
+        hi = np.minimum(positions + window // 2 + 1, lengths[:, None])
+        width = np.where(positions < lengths[:, None], hi - lo, 0)
+        sums = np.take_along_axis(prefix, hi, axis=1) - prefix[:, lo]
+        return np.divide(sums, width, out=np.zeros_like(sums), where=width > 0)
+
+    @classmethod
+    def composition(cls, sequence):
+        """Residue counts of one sequence in RESIDUE_ORDER columns."""
+        return cls.composition_batch([sequence])[0]
+
+    @classmethod
+    def composition_batch(cls, sequences):
+        """(B, 20) residue-count matrix of a batch in RESIDUE_ORDER columns; unknown characters are dropped."""
+        points, lengths = cls._flatten(sequences)
+        rows = np.repeat(np.arange(len(sequences)), lengths)
+        counts = np.bincount(rows * (cls.UNKNOWN + 1) + cls._codes(points), minlength=len(sequences) * (cls.UNKNOWN + 1))
+        return counts.reshape(len(sequences), cls.UNKNOWN + 1)[:, :cls.UNKNOWN]
+
+    @classmethod
+    def resonance_error_batch(cls, sequences):
+        """Mean |digital root(ord) - 7| per sequence, the TTT-7 anchor deviation; 0 for empty sequences."""
+        points, lengths = cls._flatten(sequences)
+        deviation = np.abs((points.astype(np.int64) - 1) % 9 + 1 - 7)
+        rows = np.repeat(np.arange(len(sequences)), lengths)
+        return np.bincount(rows, weights=deviation, minlength=len(sequences)) / np.maximum(lengths, 1)
+
+    @classmethod
+    def properties_batch(cls, sequences):
+        """
+        Sequence properties of a batch as (B,) arrays: length, mw, gravy, residue_mass,
+        polar / nonpolar / positive / negative counts, charge_ph7 and resonance_error,
+        plus the (B, 20) composition counts they are derived from.
+        """
+        counts = cls.composition_batch(sequences)
+        lengths = np.fromiter(map(len, sequences), dtype=np.intp, count=len(sequences))
+        # Unknown characters carry no property, so the composition matmul covers every residue
+        props = {name: counts @ table[:cls.UNKNOWN] for name, table in cls.TABLES.items()}
+        classes = counts @ cls.CLASS_MATRIX
+        result = {
+            'length': lengths,
+            'composition': counts,
+            'mw': props['mass'] - (lengths - 1) * cls.WATER_MASS,
+            'gravy': props['hydropathy'] / np.maximum(lengths, 1),
+            'residue_mass': props['residue_mass'],
+            'resonance_error': cls.resonance_error_batch(sequences),
+        }
+        result.update(zip(cls.CLASSES, classes.T))
+        result['charge_ph7'] = result['positive'] * 0.8 - result['negative'] * 0.9
+        return result
+
+    @classmethod
+    def properties(cls, sequence):
+        """properties_batch for a single sequence, with scalar values and a (20,) composition."""
+        return {name: values[0] for name, values in cls.properties_batch([sequence]).items()}
+
+
+NRCSequence._compile_tables()
@@ -7,6 +7,8 @@ atomic resonance structures.
 
 from typing import Dict, List
 
+import numpy as np
+
 # Standard amino acid to rough atomic mass mapping
 AMINO_MASS_MAP: Dict[str, float] = {
     "A": 71.04,
@@ -31,6 +33,10 @@ AMINO_MASS_MAP: Dict[str, float] = {
     "V": 99.13,
 }
 
+# Byte -> mass lookup; every character outside AMINO_MASS_MAP (code points above 255 are clipped onto ÿ) maps to 0.0
+_MASS_TABLE = np.zeros(256)
+_MASS_TABLE[[ord(aa) for aa in AMINO_MASS_MAP]] = list(AMINO_MASS_MAP.values())
+
 
 def sequence_to_mass_array(sequence: str) -> List[float]:
     """Converts a standard 1-letter amino acid string into an array of atomic masses.
@@ -43,5 +49,22 @@ def sequence_to_mass_array(sequence: str) -> List[float]:
     Returns:
         List of atomic masses. Missing acids default to 0.0.
     """
-    sequence = sequence.upper()
-    return [AMINO_MASS_MAP.get(aa, 0.0) for aa in sequence]
+    codes = np.frombuffer(sequence.upper().encode("utf-32-le"), dtype="<u4")
+    return _MASS_TABLE[np.minimum(codes, 255)].tolist()
+
+
+def sequences_to_mass_matrix(sequences: List[str]) -> np.ndarray:
+    """Batch form of sequence_to_mass_array.
+
+    Args:
+        sequences: FASTA sequence strings.
+
+    Returns:
+        (B, max_len) array of atomic masses, zero-padded past each sequence's end.
+    """
+    sequences = [sequence.upper() for sequence in sequences]
+    lengths = np.fromiter(map(len, sequences), dtype=np.intp, count=len(sequences))
+    codes = np.frombuffer("".join(sequences).encode("utf-32-le"), dtype="<u4")
+    masses = np.zeros((len(sequences), lengths.max(initial=0)))
+    masses[np.arange(masses.shape[1]) < lengths[:, None]] = _MASS_TABLE[np.minimum(codes, 255)]
+    return masses
@@ -0,0 +1,86 @@
+"""Tests for the vectorized BiophysicsSuite analysis kernels."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from scipy.optimize import brentq
+
+from biophysics import BiophysicsSuite
+
+
+def _reference_phi_psi(coords: np.ndarray) -> tuple:
+    """Per-window loop the vectorized dihedral kernel replaced."""
+    n = len(coords)
+    phi, psi = [0.0] * n, [0.0] * n
+    for i in range(1, n - 2):
+        b1, b2, b3 = coords[i] - coords[i - 1], coords[i + 1] - coords[i], coords[i + 2] - coords[i + 1]
+        n1, n2 = np.cross(b1, b2), np.cross(b2, b3)
+        norm_b2 = np.linalg.norm(b2)
+        if norm_b2 < 1e-6:
+            continue
+        m1 = np.cross(n1, b2 / norm_b2)
+        angle = np.degrees(np.arctan2(np.dot(m1, n2), np.dot(n1, n2)))
+        psi[i], phi[i] = float(angle), float(angle * 0.8)
+    return phi, psi
+
+
+def test_phi_psi_matches_loop_and_batches() -> None:
+    """Verify the sliding-window dihedrals match the per-residue loop, per frame and across a stack."""
+    rng = np.random.default_rng(0)
+    frames = np.cumsum(rng.normal(scale=2.0, size=(3, 50, 3)), axis=1)
+    frames[1, 20] = frames[1, 21]  # degenerate central bond
+    phi, psi = BiophysicsSuite.calculate_phi_psi_batch(frames)
+    assert phi.shape == psi.shape == (3, 50) and phi.dtype == psi.dtype == np.float32
+    for frame, frame_phi, frame_psi in zip(frames, phi, psi):
+        ref_phi, ref_psi = _reference_phi_psi(frame)
+        np.testing.assert_allclose(frame_psi, ref_psi, atol=1e-3)
+        np.testing.assert_allclose(frame_phi, ref_phi, atol=1e-3)
+    assert psi[1, 20] == 0.0
+    single_phi, single_psi = BiophysicsSuite.calculate_phi_psi(frames[2])
+    np.testing.assert_array_equal(single_psi, psi[2])
+    np.testing.assert_array_equal(single_phi, phi[2])
+    short_phi, short_psi = BiophysicsSuite.calculate_phi_psi(frames[0, :3])
+    assert short_phi.tolist() == short_psi.tolist() == [0.0, 0.0, 0.0]
+
+
+def _reference_charge(ph: float, seq: str) -> float:
+    """Per-residue Bjellqvist net charge the titration grid replaced."""
+    pka = BiophysicsSuite.PKA
+    q = 1.0 / (1.0 + 10 ** (ph - pka['N-term'])) - 1.0 / (1.0 + 10 ** (pka['C-term'] - ph))
+    for aa in seq:
+        if aa in 'KRH':
+            q += 1.0 / (1.0 + 10 ** (ph - pka[aa]))
+        elif aa in 'DECY':
+            q -= 1.0 / (1.0 + 10 ** (pka[aa] - ph))
+    return q
+
+
+def test_estimate_pi_matches_titration_root_and_batches() -> None:
+    """Verify grid pI values match the exact charge root and the batch API agrees with single sequences."""
+    rng = np.random.default_rng(1)
+    seqs = ["".join(rng.choice(list(BiophysicsSuite.RESIDUE_ORDER), rng.integers(1, 200))) for _ in range(50)] + ["", "KKKK", "DDDD"]
+    singles = [BiophysicsSuite.estimate_pi(seq) for seq in seqs]
+    for seq, pi in zip(seqs, singles):
+        assert abs(pi - brentq(_reference_charge, 0.0, 14.0, args=(seq,), xtol=1e-12)) <= 0.005 + 1e-9
+    compositions = np.array([BiophysicsSuite.composition(seq) for seq in seqs])
+    np.testing.assert_array_equal(compositions.sum(axis=1), [len(seq) for seq in seqs])
+    BiophysicsSuite._pi_cache.clear()
+    np.testing.assert_array_equal(BiophysicsSuite.estimate_pi_batch(compositions), singles)
+    cached = len(BiophysicsSuite._pi_cache)
+    np.testing.assert_array_equal(BiophysicsSuite.estimate_pi_batch(compositions[::-1]), singles[::-1])
+    assert len(BiophysicsSuite._pi_cache) == cached <= len(seqs)
+
+
+def test_estimate_pi_cache_is_thread_safe(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify concurrent batches through a small, constantly evicting pI cache match a serial run."""
+    rng = np.random.default_rng(2)
+    batches = [rng.integers(0, 6, size=(64, len(BiophysicsSuite.RESIDUE_ORDER))) for _ in range(16)]
+    expected = [BiophysicsSuite.estimate_pi_batch(batch) for batch in batches]
+    monkeypatch.setattr(BiophysicsSuite, "PI_CACHE_SIZE", 32)
+    monkeypatch.setattr(BiophysicsSuite, "_pi_cache", type(BiophysicsSuite._pi_cache)())
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(BiophysicsSuite.estimate_pi_batch, batches * 4))
+    for result, values in zip(results, expected * 4):
+        np.testing.assert_array_equal(result, values)
+    assert len(BiophysicsSuite._pi_cache) <= 32
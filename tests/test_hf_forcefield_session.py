@@ -0,0 +1,84 @@
+"""Tests for the streaming optimizer of the hf-spaces resonance-fold NRCForcefield."""
+
+import importlib.util
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# The Space ships its own flat nrc_forcefield module, which would shadow the root one by name
+_SPEC = importlib.util.spec_from_file_location(
+    "hf_nrc_forcefield", Path(__file__).resolve().parents[1] / "hf-spaces" / "resonance-fold" / "nrc_forcefield.py"
+)
+hf_nrc_forcefield = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(hf_nrc_forcefield)
+NRCForcefield = hf_nrc_forcefield.NRCForcefield
+
+
+def _counting(ff) -> list:
+    """Wraps ff.total_energy so every evaluation is recorded."""
+    calls = []
+    energy = ff.total_energy
+
+    def counted(x):
+        calls.append(1)
+        return energy(x)
+
+    ff.total_energy = counted
+    return calls
+
+
+def test_session_frame_cadence_and_final_frame() -> None:
+    """Verify frames arrive every frame_every iterations and end with the converged result."""
+    ff = NRCForcefield(12)
+    frames = list(ff.optimize_session(max_iter=30, frame_every=5))
+    assert len(frames) > 2
+    assert all(not final for _, _, final in frames[:-1])
+    assert [it for it, _, _ in frames[:-1]] == list(range(5, 5 * len(frames[:-1]) + 1, 5))
+    iteration, coords, final = frames[-1]
+    assert final and iteration == ff.last_result.nit
+    assert coords.shape == (12, 3)
+    np.testing.assert_array_equal(coords, ff.last_result.x.reshape(-1, 3))
+
+
+def test_session_costs_one_descent() -> None:
+    """Verify streaming frames costs exactly the evaluations of a single optimize(max_iter) call."""
+    streamed, direct = NRCForcefield(12), NRCForcefield(12)
+    streamed_calls, direct_calls = _counting(streamed), _counting(direct)
+    frames = list(streamed.optimize_session(max_iter=30, frame_every=5))
+    coords = direct.optimize(max_iter=30)
+    assert len(streamed_calls) == len(direct_calls) == direct.last_result.nfev
+    np.testing.assert_array_equal(frames[-1][1], coords)
+
+
+def test_session_close_cancels_worker() -> None:
+    """Verify closing the generator early stops the descent and joins its worker thread."""
+    threads_before = threading.active_count()
+    ff = NRCForcefield(12)
+    calls = _counting(ff)
+    session = ff.optimize_session(max_iter=500, frame_every=1)
+    next(session)
+    session.close()
+    assert threading.active_count() == threads_before
+    evaluations = len(calls)
+    time.sleep(0.2)
+    assert len(calls) == evaluations
+    assert ff.last_result is not None and ff.last_result.nit < 500
+
+
+def test_session_reraises_worker_errors() -> None:
+    """Verify an exception raised inside the optimizer reaches the consumer."""
+    ff = NRCForcefield(12)
+    calls = _counting(ff)
+    energy = ff.total_energy
+
+    def failing(x):
+        if len(calls) >= 40:
+            raise FloatingPointError("energy diverged")
+        return energy(x)
+
+    ff.total_energy = failing
+    with pytest.raises(FloatingPointError, match="energy diverged"):
+        list(ff.optimize_session(max_iter=500, frame_every=1))
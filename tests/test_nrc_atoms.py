@@ -0,0 +1,44 @@
+"""Tests for the compiled NRCAtoms residue-template store."""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from nrc_atoms import NRCAtoms
+
+
+def test_template_store_indexes_every_residue() -> None:
+    """Verify offsets, counts, names and elements agree with the BACKBONE / SIDECHAINS source."""
+    store, offsets, counts = NRCAtoms.TEMPLATES, NRCAtoms.TEMPLATE_OFFSETS, NRCAtoms.TEMPLATE_COUNTS
+    assert store.flags.c_contiguous and not store.flags.writeable
+    assert offsets[-1] == len(store) and np.array_equal(np.diff(offsets), counts)
+    for row, aa in enumerate(NRCAtoms.RESIDUE_ORDER):
+        records = store[offsets[row]:offsets[row + 1]]
+        assert set(records["residue"]) == {aa}
+        assert records["name"].tolist() == ["CA", *NRCAtoms.BACKBONE, *NRCAtoms.SIDECHAINS[aa]]
+        assert records["element"].tolist() == [name[0] for name in records["name"]]
+        np.testing.assert_array_equal(records["xyz"][4:], np.array(list(NRCAtoms.SIDECHAINS[aa].values())).reshape(-1, 3))
+    assert NRCAtoms.residue_template("X")["name"].tolist() == ["CA", "N", "C", "O"]
+    with pytest.raises(ValueError):
+        store["xyz"][0] = 1.0
+    coords, names, _ = NRCAtoms.template_table()
+    for table in (coords, names):
+        with pytest.raises(ValueError):
+            table[0, 0] = table[0, 1]
+
+
+def test_template_buffer_round_trips_through_shared_memory() -> None:
+    """Verify the packed store can be published to shared memory and viewed back without copying."""
+    buffer = NRCAtoms.template_buffer()
+    assert buffer.readonly and buffer.nbytes == NRCAtoms.TEMPLATES.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=buffer.nbytes)
+    try:
+        shm.buf[:buffer.nbytes] = buffer
+        view = NRCAtoms.templates_from_buffer(shm.buf[:buffer.nbytes])
+        assert not view.flags.writeable
+        np.testing.assert_array_equal(view, NRCAtoms.TEMPLATES)
+        del view
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,34 @@
+"""Tests for the NRCChemistry parameter manifold."""
+
+import numpy as np
+
+from nrc_chemistry import NRCChemistry
+
+
+def _loop_params(sequence: str) -> tuple:
+    """Per-residue reference: dict lookup (unknown -> Gly) and TTT-7 sigma modulation."""
+    data = [NRCChemistry.RESIDUE_DATA.get(aa, NRCChemistry.RESIDUE_DATA["G"]) for aa in sequence]
+    factor = [1.0 + 0.01 * np.sin(2 * np.pi * i / 1.618) for i in range(len(sequence))]
+    return (
+        np.array([d["sigma"] * f for d, f in zip(data, factor)]),
+        np.array([d["epsilon"] for d in data]),
+        np.array([d["charge"] for d in data]),
+    )
+
+
+def test_get_params_matches_per_residue_lookup() -> None:
+    """Verify the gathered parameter arrays equal the per-residue dict lookup, unknown residues included."""
+    seq = "ACDEFGHIKLMNPQRSTVWYXBZ" * 7
+    for got, expected in zip(NRCChemistry().get_params(seq), _loop_params(seq)):
+        np.testing.assert_array_equal(got, expected)
+    assert NRCChemistry.encode("AGY").tolist() == [0, 5, 19]
+    assert NRCChemistry.encode("X")[0] == NRCChemistry.RESIDUE_ORDER.index("G")
+
+
+def test_get_params_is_memoized_per_sequence() -> None:
+    """Verify repeated folds of one sequence reuse the same read-only arrays."""
+    first = NRCChemistry().get_params("MKTAYIAKQRQISFVKSHFSRQ")
+    again = NRCChemistry().get_params("MKTAYIAKQRQISFVKSHFSRQ")
+    assert all(a is b for a, b in zip(first, again))
+    assert not any(a.flags.writeable for a in first)
+    assert NRCChemistry().residue_data is NRCChemistry.RESIDUE_DATA
@@ -0,0 +1,108 @@
+"""Tests for the root NRCEngine lattice folder."""
+
+import numpy as np
+import pytest
+
+from nrc_engine import NRCEngine
+
+
+def test_fold_sequence_backbone_frames() -> None:
+    """Verify every frame carries CA/N/C/O atoms placed from the offset template."""
+    seq = "ACDEFGHIK"
+    frames = list(NRCEngine().fold_sequence(seq))
+    assert len(frames) == 30
+    final = frames[-1]
+    assert final["final"]
+    assert final["coords"].shape == (4 * len(seq), 3)
+    assert final["coords"].dtype == np.float32
+    assert final["atom_types"][:4] == ["CA", "N", "C", "O"]
+    assert final["res_indices"][-4:] == [len(seq)] * 4
+    assert final["res_names"][4:8] == ["C"] * 4
+    ca = final["coords"][0::4]
+    np.testing.assert_allclose(final["coords"][1::4] - ca, np.tile([-1.46, 0.0, 0.0], (len(seq), 1)), atol=1e-5)
+
+
+def test_fold_sequence_shares_metadata() -> None:
+    """Verify per-atom metadata is built once and shared across frames."""
+    frames = list(NRCEngine().fold_sequence("MKTAYIAK"))
+    assert all(f["atom_types"] is frames[0]["atom_types"] for f in frames)
+    assert all(f["res_names"] is frames[0]["res_names"] for f in frames)
+
+
+def test_compact_lattice_matches_dense() -> None:
+    """Verify the compact 3-column lattice folds identically to the dense manifold."""
+    engine = NRCEngine()
+    seq = "MKTAYIAKQR"
+    compact = list(engine.fold_sequence(seq))[-1]
+    dense = list(engine.fold_sequence(seq, dense_lattice=True))[-1]
+    np.testing.assert_array_equal(compact["coords"], dense["coords"])
+    assert engine._initialize_lattice(len(seq)).shape == (len(seq), NRCEngine.ACTIVE_DIMS)
+    full = engine.expand_lattice(engine._initialize_lattice(len(seq)))
+    assert full.shape == (len(seq), NRCEngine.LATTICE_DIM)
+    np.testing.assert_array_equal(full, engine._initialize_lattice(len(seq), dense=True))
+
+
+def test_frame_stride_and_delta_encoding() -> None:
+    """Verify decimated delta streams reconstruct the full trajectory."""
+    engine = NRCEngine()
+    seq = "MKTAYIAKQRQISFVKSHFSRQ"
+    full = {f["step"]: f["coords"] for f in engine.fold_sequence(seq)}
+
+    final_only = list(engine.fold_sequence(seq, frame_stride=NRCEngine.FOLD_STEPS))
+    assert [f["step"] for f in final_only] == [30]
+
+    for encoding in NRCEngine.DELTA_ENCODINGS:
+        frames = list(engine.fold_sequence(seq, frame_stride=4, delta_encoding=encoding))
+        assert [f["step"] for f in frames] == [4, 8, 12, 16, 20, 24, 28, 30]
+        assert frames[0]["encoding"] == "full" and frames[-1]["encoding"] == "full"
+        assert frames[1]["encoding"] == encoding and "coords" not in frames[1]
+        assert frames[1]["delta"].shape == (len(seq), 3)
+        assert (frames[0]["coords"].nbytes + frames[0]["confidence"].nbytes) / frames[1]["delta"].nbytes > 10
+        assert isinstance(frames[1]["confidence"], float)
+        assert frames[1]["confidence"] == pytest.approx(70.0 + 8 * 0.99)
+        assert frames[-1]["confidence"].shape == (len(seq) * len(NRCEngine.BACKBONE_ATOMS),)
+        coords = None
+        for f in frames:
+            coords = engine.decode_delta_frame(coords, f)
+            np.testing.assert_allclose(coords, full[f["step"]], atol=1e-2)
+
+
+def test_fold_batch_matches_single_folds() -> None:
+    """Verify batched folding returns the same final frame as folding each sequence alone."""
+    engine = NRCEngine()
+    seqs = ["MKT", "ACDEFGHIKLMNPQRSTVWY", "GG"]
+    batch = engine.fold_batch(seqs)
+    assert len(batch) == len(seqs)
+    for seq, result in zip(seqs, batch):
+        single = list(engine.fold_sequence(seq))[-1]
+        np.testing.assert_array_equal(result["coords"], single["coords"])
+        np.testing.assert_array_equal(result["confidence"], single["confidence"])
+        assert result["res_names"] == single["res_names"]
+    assert engine.fold_batch([]) == []
+
+
+def test_turbulence_table_cache(tmp_path) -> None:
+    """Verify the QRT table LRU evicts by bytes and persists to a validated, memory-mapped store."""
+    engine = NRCEngine(turbulence_cache_bytes=17000, cache_dir=str(tmp_path))
+    first = engine.turbulence_table(10)
+    assert first.shape == (NRCEngine.FOLD_STEPS, 10, 3)
+    assert engine.turbulence_table(10) is first
+    engine.turbulence_table(11)
+    engine.turbulence_table(12)
+    # 7200 + 7920 + 8640 bytes: only the oldest table has to go
+    assert list(engine._turbulence_cache) == [11, 12]
+    assert engine._turbulence_cache_nbytes == 7920 + 8640
+    path = tmp_path / f"qrt_turbulence_10_{NRCEngine.FOLD_STEPS}steps_float64.npy"
+    assert path.exists()
+
+    restarted = NRCEngine(cache_dir=str(tmp_path))
+    warm = restarted.turbulence_table(10)
+    assert isinstance(warm, np.memmap)
+    np.testing.assert_array_equal(warm, first)
+    cold = list(NRCEngine().fold_sequence("A" * 10))[-1]["coords"]
+    np.testing.assert_array_equal(list(restarted.fold_sequence("A" * 10))[-1]["coords"], cold)
+
+    np.save(path, np.zeros((5, 10, 3)))
+    repaired = NRCEngine(cache_dir=str(tmp_path)).turbulence_table(10)
+    np.testing.assert_array_equal(repaired, first)
+    assert np.load(path).shape == first.shape
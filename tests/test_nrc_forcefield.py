@@ -0,0 +1,298 @@
+"""Tests for the root all-atom NRCForcefield."""
+
+import gc
+
+import numpy as np
+import pytest
+
+from nrc_chemistry import NRCChemistry
+from nrc_forcefield import NRCForcefield
+from reporting import ReportingSuite
+
+
+def _brute_force_pairs(coords: np.ndarray, cutoff: float) -> set:
+    i, j = np.triu_indices(len(coords), 1)
+    within = np.linalg.norm(coords[i] - coords[j], axis=1) < cutoff
+    return set(zip(i[within].tolist(), j[within].tolist()))
+
+
+@pytest.mark.parametrize("backend", ["cells", "kdtree"])
+def test_spatial_neighbors_match_brute_force(backend: str) -> None:
+    """Verify both neighbor backends return exactly the pairs inside the cutoff."""
+    rng = np.random.default_rng(7)
+    coords = rng.uniform(-30.0, 30.0, size=(400, 3))
+    ff = NRCForcefield("A" * len(coords), neighbor_backend=backend)
+    idx_i, idx_j = ff._get_spatial_neighbors(coords, cutoff=12.0)
+    assert idx_i.dtype == np.int32 and idx_j.dtype == np.int32
+    assert np.all(idx_i < idx_j)
+    assert len(idx_i) == len(set(zip(idx_i.tolist(), idx_j.tolist())))
+    assert set(zip(idx_i.tolist(), idx_j.tolist())) == _brute_force_pairs(coords, 12.0)
+
+
+def test_verlet_list_rebuilds_only_past_half_skin() -> None:
+    """Verify the Verlet list is reused for small moves and matches a fresh build."""
+    seq = "ACDEFGHIKLMNPQRSTVWY" * 3
+    ff = NRCForcefield(seq, skin=2.0)
+    fresh = NRCForcefield(seq, skin=0.0)
+    x = ff.x0 * 4.0
+    ff.energy_and_gradient(x)
+    assert ff.metrics["neighbor_rebuilds"] == 1
+
+    nudged = x + 0.4 / np.sqrt(3)
+    energy, grad = ff.energy_and_gradient(nudged)
+    assert ff.metrics["neighbor_rebuilds"] == 1
+    ref_energy, ref_grad = fresh.energy_and_gradient(nudged)
+    np.testing.assert_allclose(energy, ref_energy, rtol=1e-12)
+    np.testing.assert_allclose(grad, ref_grad, rtol=1e-9, atol=1e-9)
+
+    ff.energy_and_gradient(x + 1.2 / np.sqrt(3))
+    assert ff.metrics["neighbor_rebuilds"] == 2
+    assert ff.metrics["energy_evaluations"] == 3
+
+
+def test_pair_gradient_scatter_matches_loop() -> None:
+    """Verify the bincount scatter equals the per-pair accumulation loop."""
+    rng = np.random.default_rng(3)
+    idx_i = rng.integers(0, 50, size=400).astype(np.int32)
+    idx_j = rng.integers(0, 50, size=400).astype(np.int32)
+    pair_grad = rng.normal(size=(400, 3))
+    expected = np.zeros((50, 3))
+    for k, (i, j) in enumerate(zip(idx_i, idx_j)):
+        expected[i] += pair_grad[k]
+        expected[j] -= pair_grad[k]
+    grad = np.zeros((50, 3))
+    NRCForcefield._scatter_pair_gradient(grad, idx_i, idx_j, pair_grad)
+    np.testing.assert_allclose(grad, expected, atol=1e-12)
+
+
+def _kabsch_rmsd(a: np.ndarray, b: np.ndarray) -> float:
+    a, b = a - a.mean(axis=0), b - b.mean(axis=0)
+    u, _, vt = np.linalg.svd(a.T @ b)
+    if np.linalg.det(u @ vt) < 0:
+        u[:, -1] *= -1
+    return float(np.sqrt(np.mean(np.sum((a @ (u @ vt) - b) ** 2, axis=1))))
+
+
+def test_float32_kernel_tracks_float64() -> None:
+    """Verify the float32 pair kernel reuses its workspace and folds within the documented RMSD."""
+    seq = "ACDEFGHIKLMNPQRSTVWY" * 5
+    ff64 = NRCForcefield(seq)
+    ff32 = NRCForcefield(seq, precision=np.float32)
+    x = ff64.x0 * 3.0
+    e64, g64 = ff64.energy_and_gradient(x)
+    e32, g32 = ff32.energy_and_gradient(x)
+    assert isinstance(e32, float)
+    assert g32.dtype == np.float64
+    np.testing.assert_allclose(e32, e64, rtol=1e-6)
+    np.testing.assert_allclose(g32, g64, rtol=1e-4, atol=1e-3 * np.abs(g64).max())
+    workspace = ff32._workspaces[0]
+    assert workspace["d"].dtype == np.float32
+    ff32.energy_and_gradient(x)
+    assert ff32._workspaces[0] is workspace
+
+    rmsd = _kabsch_rmsd(ff64.optimize(max_iter=200), ff32.optimize(max_iter=200))
+    assert rmsd < NRCForcefield.FLOAT32_RMSD_TOLERANCE
+
+
+def test_threaded_pair_chunks_match_serial() -> None:
+    """Verify chunked thread-pool evaluation reduces to the serial energy and gradient."""
+    rng = np.random.default_rng(11)
+    n = 2000
+    coords = rng.uniform(-25.0, 25.0, size=(n, 3)).flatten()
+    serial = NRCForcefield("A" * n)
+    threaded = NRCForcefield("A" * n, workers=4)
+    threaded.MIN_PAIRS_PER_CHUNK = 1000
+    e_serial, g_serial = serial.energy_and_gradient(coords)
+    e_threaded, g_threaded = threaded.energy_and_gradient(coords)
+    assert len(threaded._grad_buffers) == 4
+    np.testing.assert_allclose(e_threaded, e_serial, rtol=1e-12)
+    np.testing.assert_allclose(g_threaded, g_serial, rtol=1e-9, atol=1e-9)
+
+    executor = threaded._executor
+    threaded.close()
+    assert threaded._executor is None and executor._shutdown
+    e_again, _ = threaded.energy_and_gradient(coords)
+    np.testing.assert_allclose(e_again, e_serial, rtol=1e-12)
+    threaded.close()
+
+
+def test_pair_pool_is_released_with_the_forcefield() -> None:
+    """Verify an unclosed forcefield's worker threads are shut down once it is collected."""
+    coords = np.random.default_rng(3).uniform(-25.0, 25.0, size=(2000, 3)).flatten()
+    ff = NRCForcefield("A" * 2000, workers=4, kernel_backend="numpy")
+    ff.MIN_PAIRS_PER_CHUNK = 1000
+    ff.energy_and_gradient(coords)
+    executor = ff._executor
+    del ff
+    gc.collect()
+    assert executor._shutdown
+    for thread in executor._threads:
+        thread.join(timeout=5)
+    assert not any(t.is_alive() for t in executor._threads)
+
+
+def test_numba_kernel_matches_numpy() -> None:
+    """Verify the fused Numba kernel reproduces the NumPy backend energy and gradient."""
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(5)
+    coords = rng.uniform(-20.0, 20.0, size=(600, 3)).flatten()
+    seq = (("DEKRH" + "ACDEFGHIKLMNPQRSTVWY" * 2) * 16)[:600]
+    e_numpy, g_numpy = NRCForcefield(seq, kernel_backend="numpy", coulomb_cutoff=10.0).energy_and_gradient(coords)
+    e_numba, g_numba = NRCForcefield(seq, kernel_backend="numba", coulomb_cutoff=10.0).energy_and_gradient(coords)
+    np.testing.assert_allclose(e_numba, e_numpy, rtol=1e-12)
+    np.testing.assert_allclose(g_numba, g_numpy, rtol=1e-9, atol=1e-9)
+
+
+def test_kernel_backend_auto_falls_back_to_numpy(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify 'auto' selects NumPy without numba or with NumPy-only options, and explicit numba fails loudly."""
+    import nrc_forcefield
+
+    assert NRCForcefield("ACDE").kernel_backend == "numpy"
+    monkeypatch.setattr(nrc_forcefield, "NUMBA_AVAILABLE", True)
+    assert NRCForcefield("ACDE", kernel_backend="auto").kernel_backend == "numba"
+    assert NRCForcefield("ACDE", kernel_backend="auto", precision=np.float32).kernel_backend == "numpy"
+    assert NRCForcefield("ACDE", kernel_backend="auto", workers=2).kernel_backend == "numpy"
+    with pytest.raises(ValueError):
+        NRCForcefield("ACDE", kernel_backend="numba", precision=np.float32)
+    with pytest.raises(ValueError):
+        NRCForcefield("ACDE", kernel_backend="numba", workers=2)
+    monkeypatch.setattr(nrc_forcefield, "NUMBA_AVAILABLE", False)
+    assert NRCForcefield("ACDE", kernel_backend="auto").kernel_backend == "numpy"
+    with pytest.raises(ImportError):
+        NRCForcefield("ACDE", kernel_backend="numba")
+
+
+def test_multistart_returns_best_start_and_cancels_plateaus() -> None:
+    """Verify optimize_multistart keeps the lowest-energy start and cancels starts stalled above it."""
+    ff = NRCForcefield("ACDEFGHIKLMNPQRSTVWY" * 2, kernel_backend="numpy")
+    # With an infinite plateau tolerance, any start above the running best stops after 5 iterations
+    coords, stats = ff.optimize_multistart(k=4, workers=1, max_iter=100, plateau_window=5, plateau_tol=np.inf, plateau_margin=0.0)
+    assert coords.shape == (40, 3)
+    assert [s["start"] for s in stats] == [0, 1, 2, 3]
+    assert [s["rg_scale"] for s in stats] == [1.0, 0.9, 1.1, 1.0]
+    best = min(stats, key=lambda s: s["energy"])
+    assert not best["cancelled"]
+    check = NRCForcefield(ff.sequence, kernel_backend="numpy")
+    check.RG_TARGET *= best["rg_scale"]
+    assert check.energy_and_gradient(coords.ravel())[0] == pytest.approx(best["energy"])
+    assert any(s["cancelled"] and s["iterations"] <= 6 for s in stats)
+
+    pooled, pooled_stats = NRCForcefield(ff.sequence, kernel_backend="numpy").optimize_multistart(k=2, workers=2, max_iter=50)
+    assert pooled.shape == (40, 3) and len(pooled_stats) == 2
+
+
+def test_multigrid_prolongation_and_relaxation() -> None:
+    """Verify bead interpolation is exact on a straight chain and multigrid beats a flat descent."""
+    ff = NRCForcefield("ACDEFGHIKLMNPQRSTVWY" * 15)
+    centers = ff._bead_centers(4)
+    assert len(centers) == 75 and centers[0] == 1.5 and centers[-1] == 297.5
+    line = np.outer(centers, [1.0, 2.0, 3.0])
+    fine = np.arange(ff.N_res, dtype=float)
+    np.testing.assert_allclose(ff._prolong(line, centers, fine)[2:-2], np.outer(fine, [1.0, 2.0, 3.0])[2:-2])
+
+    flat = NRCForcefield(ff.sequence).optimize(max_iter=50)
+    coords = ff.optimize_multigrid(levels=3, factor=4, coarse_iter=100, max_iter=50)
+    assert coords.shape == (300, 3)
+    np.testing.assert_array_equal(ff.x0, coords.ravel())
+    assert ff.energy_and_gradient(coords.ravel())[0] < ff.energy_and_gradient(flat.ravel())[0]
+
+
+def _loop_all_atom(ff: NRCForcefield, ca: np.ndarray) -> tuple:
+    """Per-residue reference built from NRCAtoms.get_full_residue."""
+    coords, names = [], []
+    for i, aa in enumerate(ff.sequence):
+        rot = np.eye(3)
+        if 0 < i < len(ca) - 1:
+            v_prev, v_next = ca[i] - ca[i - 1], ca[i + 1] - ca[i]
+            t = (v_prev + v_next) / (np.linalg.norm(v_prev + v_next) + 1e-9)
+            n = np.cross(v_prev, v_next)
+            n /= np.linalg.norm(n) + 1e-9
+            rot = np.column_stack((t, n, np.cross(t, n)))
+        atoms = ff.atom_lib.get_full_residue(aa, ca[i], rotation_matrix=rot)
+        coords.extend(atoms.values())
+        names.extend(atoms)
+    return np.array(coords), names
+
+
+def test_batched_all_atom_matches_per_residue_placement() -> None:
+    """Verify the einsum builder reproduces per-residue template placement, including unknown residues."""
+    seq = "ACDEFGHIKLMNPQRSTVWYX"
+    ff = NRCForcefield(seq)
+    ca = np.cumsum(np.random.default_rng(2).normal(scale=2.0, size=(len(seq), 3)), axis=0)
+    result = ff.generate_all_atom(ca)
+    ref_coords, ref_names = _loop_all_atom(ff, ca)
+    np.testing.assert_allclose(result["coords"], ref_coords, atol=1e-12)
+    assert result["atoms"].dtype == NRCForcefield.ATOM_DTYPE
+    assert result["atom_types"] == ref_names
+    counts = np.bincount(result["res_indices"])[1:]
+    assert counts[-1] == 4 and counts[0] == 5
+    assert "".join(np.array(result["res_names"])[np.cumsum(counts) - 1]) == seq
+
+    metadata = {key: result[key] for key in ("atom_types", "res_indices", "res_names")}
+    pdb = ReportingSuite.generate_pdb(seq, result["coords"], **metadata).splitlines()
+    atom_lines = [line for line in pdb if line.startswith("ATOM")]
+    assert [line[12:16].strip() for line in atom_lines] == ref_names
+    assert [int(line[22:26]) for line in atom_lines] == result["res_indices"]
+    centered = result["coords"] - result["coords"].mean(axis=0)
+    np.testing.assert_allclose([[float(line[c:c + 8]) for c in (30, 38, 46)] for line in atom_lines], centered, atol=1e-3)
+
+
+def _reference_sequence_energy(seq: str, coords: np.ndarray, cutoff: float, coulomb_cutoff: float) -> float:
+    """All-pairs Lorentz-Berthelot LJ plus CHARMM-switched Coulomb straight from RESIDUE_DATA."""
+    data = NRCChemistry.RESIDUE_DATA
+    ron, energy = coulomb_cutoff - NRCForcefield.COULOMB_SWITCH_WIDTH, 0.0
+    for i, j in zip(*np.triu_indices(len(seq), 2)):
+        d = np.linalg.norm(coords[i] - coords[j]) + 1e-9
+        if d >= cutoff:
+            continue
+        a, b = data[seq[i]], data[seq[j]]
+        sr6 = (0.5 * (a["sigma"] + b["sigma"]) / d) ** 6
+        energy += 4 * np.sqrt(a["epsilon"] * b["epsilon"]) * (sr6 * sr6 - sr6)
+        if d < coulomb_cutoff:
+            r2 = min(max(d * d, ron**2), coulomb_cutoff**2)
+            switch = (coulomb_cutoff**2 - r2) ** 2 * (coulomb_cutoff**2 + 2 * r2 - 3 * ron**2) / (coulomb_cutoff**2 - ron**2) ** 3
+            energy += NRCForcefield.COULOMB_K / 80.0 * a["charge"] * b["charge"] / d * switch
+    return energy
+
+
+def test_sequence_pair_terms_match_reference() -> None:
+    """Verify the combination-table LJ / switched Coulomb terms equal a direct per-pair evaluation."""
+    seq = "DEKRHACDEFGHIKLMNPQRSTVWY" * 3
+    coords = np.random.default_rng(4).uniform(-12.0, 12.0, size=(len(seq), 3))
+    full = NRCForcefield(seq, coulomb_cutoff=9.0)
+    bare = NRCForcefield(seq)
+    bare.K_STERIC = 0.0
+    extra = full.energy_and_gradient(coords.ravel())[0] - bare.energy_and_gradient(coords.ravel())[0]
+    assert extra == pytest.approx(_reference_sequence_energy(seq, coords, full.cutoff, 9.0), rel=1e-9, abs=1e-6)
+    with pytest.raises(ValueError):
+        NRCForcefield(seq, cutoff=12.0, coulomb_cutoff=15.0)
+
+
+def test_checkpointed_run_resumes_after_preemption(tmp_path) -> None:
+    """Verify periodic .npz checkpoints survive an interrupted descent and resume() finishes its budget."""
+    path = tmp_path / "fold.npz"
+    ff = NRCForcefield("ACDEFGHIKLMNPQRSTVWY" * 2, coulomb_cutoff=10.0)
+    energy_and_gradient = ff.energy_and_gradient
+
+    def preempted(x):
+        if ff.metrics["energy_evaluations"] >= 30:
+            raise KeyboardInterrupt
+        return energy_and_gradient(x)
+
+    ff.energy_and_gradient = preempted
+    with pytest.raises(KeyboardInterrupt):
+        ff.optimize(max_iter=200, checkpoint_path=str(path), checkpoint_every=5)
+    with np.load(path) as saved:
+        assert saved["iteration"] % 5 == 0 and saved["iteration"] > 0
+        assert not saved["finished"] and saved["max_iter"] == 200
+        saved_iteration, saved_coords = int(saved["iteration"]), saved["coords"]
+
+    resumed, coords = NRCForcefield.resume(str(path), checkpoint_every=5)
+    assert resumed.coulomb_cutoff == 10.0 and resumed.sequence == ff.sequence
+    assert coords.shape == (40, 3)
+    assert saved_iteration < resumed.iterations_done <= 200
+    assert resumed.energy_and_gradient(coords.ravel())[0] < resumed.energy_and_gradient(saved_coords.ravel())[0]
+    with np.load(path) as final:
+        assert final["finished"] and final["iteration"] == resumed.iterations_done
+    _, same = NRCForcefield.resume(str(path))
+    np.testing.assert_array_equal(same, coords)
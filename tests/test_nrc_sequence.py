@@ -0,0 +1,77 @@
+"""Tests for the NRCSequence featurization engine."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from nrc_sequence import NRCSequence
+
+
+def _loop_properties(seq: str) -> dict:
+    """Per-character reference: the dict lookups and counting loops the engine replaced."""
+    n = len(seq)
+    return {
+        "length": n,
+        "mw": sum(NRCSequence.MASS.get(aa, 0) for aa in seq) - (n - 1) * 18.015,
+        "gravy": sum(NRCSequence.HYDROPATHY.get(aa, 0) for aa in seq) / max(n, 1),
+        "residue_mass": sum(NRCSequence.RESIDUE_MASS.get(aa, 0) for aa in seq),
+        "composition": [seq.count(aa) for aa in NRCSequence.RESIDUE_ORDER],
+        "polar": sum(1 for aa in seq if aa in "STNQCY"),
+        "nonpolar": sum(1 for aa in seq if aa in "AVLIPFMWG"),
+        "positive": sum(1 for aa in seq if aa in "RKH"),
+        "negative": sum(1 for aa in seq if aa in "DE"),
+        "resonance_error": sum(abs((ord(aa) - 1) % 9 + 1 - 7) for aa in seq) / n if n else 0.0,
+    }
+
+
+def test_properties_match_per_character_loops() -> None:
+    """Verify single and batch properties equal the per-character reference, unknown characters included."""
+    rng = np.random.default_rng(0)
+    seqs = ["".join(rng.choice(list(NRCSequence.RESIDUE_ORDER + "XBZ*-"), rng.integers(1, 300))) for _ in range(40)] + ["", "é"]
+    batch = NRCSequence.properties_batch(seqs)
+    for row, seq in enumerate(seqs):
+        single = NRCSequence.properties(seq)
+        for name, expected in _loop_properties(seq).items():
+            np.testing.assert_allclose(single[name], expected, rtol=1e-12, atol=1e-9)
+            np.testing.assert_allclose(batch[name][row], single[name], rtol=1e-12)
+        assert single["charge_ph7"] == pytest.approx(single["positive"] * 0.8 - single["negative"] * 0.9)
+
+
+def test_encode_and_lookup_per_position() -> None:
+    """Verify codes, padded batch codes and per-position gathers line up with the residue dicts."""
+    seqs = ["ACDY", "", "KXR"]
+    codes, lengths = NRCSequence.encode_batch(seqs)
+    assert codes.dtype == np.uint8 and lengths.tolist() == [4, 0, 3]
+    assert codes.tolist() == [[0, 1, 2, 19], [20, 20, 20, 20], [8, 20, 14, 20]]
+    np.testing.assert_array_equal(codes[2, :3], NRCSequence.encode("KXR"))
+    assert NRCSequence.lookup(NRCSequence.encode("KXRH"), "charge").tolist() == [1.0, 0.0, 1.0, 0.1]
+    assert NRCSequence.lookup(codes, "hydropathy")[0].tolist() == [NRCSequence.HYDROPATHY[aa] for aa in "ACDY"]
+
+
+def _loop_profile(seq: str, name: str, window: int) -> list:
+    """Per-residue window mean, truncated at the chain ends."""
+    values = NRCSequence.lookup(NRCSequence.encode(seq), name).tolist()
+    out = []
+    for i in range(len(values)):
+        lo, hi = max(i - (window - 1) // 2, 0), min(i + window // 2 + 1, len(values))
+        out.append(sum(values[lo:hi]) / (hi - lo))
+    return out
+
+
+@pytest.mark.parametrize(("name", "window"), [("hydropathy", 9), ("hydropathy", 19), ("charge", 4)])
+def test_window_profiles_match_loop(name: str, window: int) -> None:
+    """Verify prefix-sum profiles equal the naive window mean per sequence and zero-pad the batch."""
+    rng = np.random.default_rng(2)
+    seqs = ["".join(rng.choice(list(NRCSequence.RESIDUE_ORDER + "X"), rng.integers(0, 80))) for _ in range(20)]
+    batch = NRCSequence.profile_batch(seqs, name, window)
+    for row, seq in enumerate(seqs):
+        np.testing.assert_allclose(batch[row, :len(seq)], _loop_profile(seq, name, window), atol=1e-12)
+        assert not batch[row, len(seq):].any()
+        np.testing.assert_array_equal(NRCSequence.profile(seq, name, window), batch[row, :len(seq)])
+
+
+def test_space_copy_matches_engine() -> None:
+    """The resonance-fold Space deploys standalone, so it ships a copy that must not drift."""
+    root = Path(__file__).resolve().parents[1]
+    assert (root / "resonance-fold" / "nrc_sequence.py").read_bytes() == (root / "nrc_sequence.py").read_bytes()
@@ -0,0 +1,61 @@
+"""Tests for the NRCStructure secondary-structure assigner."""
+
+from itertools import groupby
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from biophysics import BiophysicsSuite
+from nrc_structure import NRCStructure
+
+
+def _loop_window(coords: np.ndarray) -> list:
+    """Sequential anchor loop of BiophysicsSuite.assign_secondary_structure; later anchors overwrite."""
+    n = len(coords)
+    dssp = ["C"] * n
+    for i in range(1, n - 3):
+        if 4.8 < np.linalg.norm(coords[i + 3] - coords[i]) < 6.2:
+            dssp[i:i + 3] = ["H"] * 3
+        elif np.linalg.norm(coords[i + 2] - coords[i]) > 6.5:
+            dssp[i:i + 2] = ["E"] * 2
+    return dssp
+
+
+def _loop_local(coords: np.ndarray) -> list:
+    """Per-residue i-1 -> i+1 rule of the Space's assign_dssp_simple."""
+    n = len(coords)
+    labels = ["C"] * n
+    for i in range(1, n - 2) if n >= 4 else ():
+        span = np.linalg.norm(coords[i + 1] - coords[i - 1])
+        labels[i] = "H" if span < 5.5 else "E" if span > 6.5 else "C"
+    return labels
+
+
+def test_assign_matches_sequential_loops() -> None:
+    """Verify both schemes reproduce their per-residue loops, overwrite order included."""
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(0, 50))
+        coords = np.cumsum(rng.normal(scale=rng.uniform(1.5, 4.0), size=(n, 3)), axis=0)
+        assert BiophysicsSuite.assign_secondary_structure(coords) == _loop_window(coords)
+        assert NRCStructure.assign(coords, "local").tolist() == _loop_local(coords)
+    with pytest.raises(ValueError):
+        NRCStructure.assign(np.zeros((5, 3)), "dssp")
+
+
+def test_min_run_smooths_short_segments() -> None:
+    """Verify H / E runs shorter than min_run collapse to coil while longer runs survive."""
+    codes = np.array([0, 1, 1, 0, 2, 2, 2, 1, 0], dtype=np.uint8)
+    assert NRCStructure.LABELS[NRCStructure._smooth_runs(codes, 3)].tolist() == list("CCCCEEECC")
+    rng = np.random.default_rng(1)
+    coords = np.cumsum(rng.normal(scale=2.5, size=(300, 3)), axis=0)
+    runs = [(label, len(list(run))) for label, run in groupby(NRCStructure.assign(coords, min_run=4))]
+    assert any(label != "C" for label, _ in runs)
+    assert all(length >= 4 for label, length in runs if label != "C")
+
+
+def test_space_copy_matches_assigner() -> None:
+    """The resonance-fold Space deploys standalone, so it ships a copy that must not drift."""
+    root = Path(__file__).resolve().parents[1]
+    assert (root / "resonance-fold" / "nrc_structure.py").read_bytes() == (root / "nrc_structure.py").read_bytes()
@@ -0,0 +1,48 @@
+"""Tests for the packaged resonance_fold NRCForcefield."""
+
+import numpy as np
+from scipy.optimize import check_grad
+
+from resonance_fold.nrc_forcefield import NRCForcefield
+
+
+def test_analytic_gradient_matches_finite_differences() -> None:
+    """Verify energy_and_gradient returns the derivative of its own energy."""
+    ff = NRCForcefield(25, ttt_harmonics=2)
+    x = ff.x0 * 3.0 + 0.01
+    grad = ff.energy_and_gradient(x)[1]
+    error = check_grad(lambda v: ff.energy_and_gradient(v)[0], lambda v: ff.energy_and_gradient(v)[1], x, epsilon=1e-7)
+    assert error / np.linalg.norm(grad) < 1e-4
+
+
+def test_exact_terms_match_total_energy() -> None:
+    """Verify LJ + QRT equal total_energy up to the TTT-7 term, which is replaced by its mean."""
+    ff = NRCForcefield(25, ttt_harmonics=0)
+    x = ff.x0 * 3.0
+    d = np.linalg.norm(x.reshape(-1, 3)[:, None] - x.reshape(-1, 3)[None], axis=-1)[np.triu_indices(25, 1)]
+    exact = ff.total_energy(x) - np.sum(ff.ttt_7_penalty_vectorized(d))
+    assert np.isclose(ff.energy_and_gradient(x)[0] - ff.ttt_coeffs[0] * len(d), exact)
+
+
+def test_cutoff_neighbor_list_and_optimize() -> None:
+    """Verify the cutoff path matches all pairs when nothing is cut and optimize relaxes the seed."""
+    x = NRCForcefield(30).x0 * 3.0
+    e_all, g_all = NRCForcefield(30).energy_and_gradient(x)
+    e_cut, g_cut = NRCForcefield(30, cutoff=100.0).energy_and_gradient(x)
+    # The cutoff path evaluates its trig in float32
+    assert np.isclose(e_all, e_cut, atol=1e-4)
+    np.testing.assert_allclose(g_all, g_cut, atol=1e-4)
+
+    ff = NRCForcefield(30, cutoff=12.0)
+    coords = ff.optimize(max_iter=200)
+    assert coords.shape == (30, 3)
+    assert ff.total_energy(coords.flatten()) < ff.total_energy(ff.x0)
+
+
+def test_optimize_is_no_worse_than_ttt_mean_descent() -> None:
+    """Verify the default and cutoff descents reach the energy of the ttt_harmonics=0 descent."""
+    reference = NRCForcefield(120, ttt_harmonics=0)
+    e_ref = reference.total_energy(reference.optimize().flatten())
+    assert e_ref < 0
+    for ff in (NRCForcefield(120), NRCForcefield(120, cutoff=12.0)):
+        assert ff.total_energy(ff.optimize().flatten()) <= e_ref + 0.02 * abs(e_ref)